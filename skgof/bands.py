@@ -0,0 +1,226 @@
+"""
+Confidence bands for the distribution function of a sample.
+
+`ks_band()` gives the band of constant width around the empirical
+distribution function, its half-width being the critical value of the
+Kolmogorov-Smirnov statistic. Critical values are found for all distinct
+sample counts at once (by secant steps on the logarithm of the survival
+function, started from the asymptotic value with Stephens' correction) and
+shared with `critical_value()`, so bands for many series of a few lengths
+cost little more than sorting::
+
+    >>> band = ks_band((.3, .1, .9, .4), alpha=.1)
+    >>> band.values
+    array([0.1, 0.3, 0.4, 0.9])
+    >>> band.lower.round(3)
+    array([0.   , 0.   , 0.   , 0.185, 0.435])
+
+Bounds hold on the stretches between the values: the first pair below the
+least value, each of the next ones from a value (inclusive) to the next one.
+
+`beta_band()` gives a band of the Berk-Jones type, narrower in the tails:
+each order statistic of the uniform sample is kept within the same central
+interval of its beta distribution, with the local level of the intervals
+calibrated so that the whole band covers the distribution function with the
+requested confidence. Coverage of a band is computed exactly, as the
+probability of a Poisson process staying between the bounds (see
+`band_coverage()`).
+"""
+from __future__ import division
+
+from collections import namedtuple
+
+from numpy import (arange, argsort, asarray, concatenate, exp, isfinite, log,
+                   ones, sort, sqrt, unique, zeros)
+from scipy.optimize import brentq
+from scipy.special import kolmogi
+from scipy.stats import beta
+
+from . import instrument
+from .ecdfgof import critical_cache, critical_cache_size, critical_value
+from .ksdist import _poisson_pmf, _poisson_step, ks_unif
+
+Band = namedtuple('Band', ('values', 'lower', 'upper'))
+
+# Local levels of beta bands by sample count and confidence level.
+level_cache = {}
+
+
+def ks_band(data, alpha=.05, assume_sorted=False):
+    """
+    Gives the Kolmogorov-Smirnov confidence band for a sample.
+
+    Data may also be a 2-D array, with a sample in each row; the bounds
+    depend only on the sample count, so they are the same for all rows.
+    Returns sorted values and bounds (one more than values) of the band,
+    that covers the distribution function with a probability of 1 - alpha.
+    """
+    data = asarray(data)
+    if not assume_sorted:
+        data = sort(data, axis=-1)
+    samples = data.shape[-1]
+    steps = arange(samples + 1) / samples
+    critical = ks_critical(samples, alpha)
+    return Band(data, (steps - critical).clip(min=0),
+                (steps + critical).clip(max=1))
+
+
+def ks_bands(samples, alpha=.05, assume_sorted=False):
+    """
+    Gives Kolmogorov-Smirnov bands for a number of samples of any counts.
+
+    Critical values are computed once for each distinct count.
+    """
+    samples = [asarray(sample) for sample in samples]
+    criticals = ks_critical([len(sample) for sample in samples], alpha)
+    bands = []
+    for sample, critical in zip(samples, criticals):
+        steps = arange(len(sample) + 1) / len(sample)
+        bands.append(Band(sample if assume_sorted else sort(sample),
+                          (steps - critical).clip(min=0),
+                          (steps + critical).clip(max=1)))
+    return bands
+
+
+def ks_critical(samples, alpha=.05):
+    """
+    Finds Kolmogorov-Smirnov critical values for an array of sample counts.
+
+    Values are solved for simultaneously for the distinct counts missing
+    from the cache; secant steps usually converge in three or four survival
+    function evaluations (Brent's method is a fallback).
+    """
+    samples = asarray(samples, dtype=int)
+    counts, indices = unique(samples, return_inverse=True)
+    values = {}
+    for count in counts:
+        key = (ks_unif, count, alpha)
+        instrument.lookup('critical', key in critical_cache)
+        if key in critical_cache:
+            # Moved to the end, as the most recently used.
+            values[count] = critical_cache[key] = critical_cache.pop(key)
+    missing = [count for count in counts if count not in values]
+    if missing:
+        new = asarray(missing, dtype=float)
+        for count, value in zip(missing, _ks_secant(new, alpha)):
+            if not isfinite(value):
+                value = critical_value(ks_unif, count, alpha)
+            values[count] = critical_cache[(ks_unif, count, alpha)] = value
+        while len(critical_cache) > critical_cache_size:
+            critical_cache.popitem(last=False)
+    criticals = asarray([values[count] for count in counts])
+    return criticals[indices].reshape(samples.shape)[()]
+
+
+def _ks_secant(samples, alpha):
+    """
+    Solves for critical values of a few counts, giving nans if not converged.
+    """
+    root = sqrt(samples)
+    previous = kolmogi(alpha) / (root + .12 + .11 / root)
+    current = previous * 1.01
+
+    def excess(statistics, counts):
+        return log(ks_unif.sf(statistics, counts)) - log(alpha)
+
+    before, after = excess(previous, samples), excess(current, samples)
+    for _ in range(20):
+        active = (abs(after) > 1e-13) & (after != before)
+        if not active.any():
+            break
+        step = after[active] * ((current[active] - previous[active]) /
+                                (after[active] - before[active]))
+        previous, before = current.copy(), after.copy()
+        current[active] -= step
+        current[active] = current[active].clip(1e-10, 1)
+        after[active] = excess(current[active], samples[active])
+    current[~(abs(after) <= 1e-10)] = float('nan')
+    return current
+
+
+def beta_band(data, alpha=.05, assume_sorted=False):
+    """
+    Gives a confidence band with equal local levels for a sample.
+
+    The i-th order statistic of the uniform sample is bounded by the
+    central interval of its beta(i, n - i + 1) distribution, at a local
+    level calibrated to an overall coverage of 1 - alpha. Data may also be
+    a 2-D array, with a sample in each row. Returns the same fields as
+    `ks_band()`.
+    """
+    data = asarray(data)
+    if not assume_sorted:
+        data = sort(data, axis=-1)
+    samples = data.shape[-1]
+    lower, upper = _beta_bounds(samples, beta_level(samples, alpha))
+    return Band(data, concatenate(((0,), lower)), concatenate((upper, (1,))))
+
+
+def beta_level(samples, alpha=.05):
+    """
+    Finds (or recalls) the local level of beta bands with the given coverage.
+
+    The level lies between alpha / samples (by Bonferroni's inequality) and
+    alpha, and is found by Brent's method on its logarithm.
+    """
+    key = (samples, alpha)
+    instrument.lookup('beta_level', key in level_cache)
+    if key not in level_cache:
+        if samples == 1:
+            level_cache[key] = alpha
+        else:
+            def excess(level):
+                bounds = _beta_bounds(samples, exp(level))
+                return 1 - alpha - band_coverage(*bounds)
+
+            level = brentq(excess, log(alpha / samples), log(alpha),
+                           xtol=1e-8)
+            level_cache[key] = exp(level)
+    return level_cache[key]
+
+
+def band_coverage(lower, upper):
+    """
+    Calculates the probability of uniform order statistics within bounds.
+
+    The i-th least of n uniform values (n being the length of the bounds)
+    should be between lower[i] and upper[i]; bounds should be increasing.
+    The i-th value is at least lower[i] if fewer than i + 1 events of a
+    Poisson process (with n events expected over [0, 1]) come before it,
+    and at most upper[i] if at least i + 1 do, so counts are propagated
+    through the sorted bounds by convolutions with Poisson probabilities,
+    keeping only the counts allowed, and conditioned on n events in total.
+    """
+    lower, upper = asarray(lower, dtype=float), asarray(upper, dtype=float)
+    samples = len(lower)
+    points = concatenate((lower, upper))
+    # Lower bounds cap counts, upper ones raise the least count allowed.
+    caps = concatenate((arange(samples), -ones(samples, int)))
+    floors = concatenate((zeros(samples, int), arange(1, samples + 1)))
+    low, state = 0, ones((1, 1))
+    previous = 0.
+    for index in argsort(points, kind='mergesort'):
+        point = points[index]
+        if point > previous:
+            state = _poisson_step(state, low, samples * (point - previous),
+                                  samples)
+            previous = point
+        if floors[index] > low:
+            state = state[:, floors[index] - low:]
+            low = floors[index]
+        if caps[index] >= 0:
+            state = state[:, :caps[index] - low + 1]
+        if state.size == 0:
+            return 0.
+    counts = arange(low, low + state.shape[1])
+    finishing = _poisson_pmf(samples - counts, samples * (1 - previous))
+    return min(1., state[0].dot(finishing) / _poisson_pmf(samples, samples))
+
+
+def _beta_bounds(samples, level):
+    """
+    Gives central intervals of the given level for uniform order statistics.
+    """
+    orders = arange(1, samples + 1)
+    dist = beta(orders, samples + 1 - orders)
+    return dist.ppf(level / 2), dist.isf(level / 2)
@@ -0,0 +1,188 @@
+"""
+Goodness-of-fit tests for samples too large to be sorted in memory, or for
+samples split into separately sorted shards.
+
+For `external_test()` the data is read in chunks, each chunk is sorted and
+passed through the hypothesized distribution function, and the resulting runs
+(stored in temporary files) are merged, with the statistics accumulated over
+the merged sequence using ranks of the values in the whole sample (see
+`EdfAccumulator`). For `sharded_test()` the shards are uniformized in
+parallel and merged in memory the same way, without sorting the whole sample
+again. Only the statistics computed by `edf_stats()` are supported.
+
+Example::
+
+    from scipy.stats import expon
+    from skgof.chunked import external_test
+    from skgof.ecdfgof import ks_stat
+    from skgof.ksdist import ks_unif
+
+    # A .npy file with 10^9 doubles, processed in pieces of 10^7 values.
+    external_test('events.npy', expon(0, 3), stat=ks_stat, pdist=ks_unif,
+                  chunk_size=10 ** 7)
+"""
+from __future__ import division
+
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from numpy import concatenate, inf, load, memmap, searchsorted, sort
+from scipy._lib.six import string_types
+
+from .addist import ad_unif
+from .ecdfgof import EdfAccumulator, GofResult, _frozen, ad_stat, edf_field
+from .parallel import parallel_cdf
+
+# Number of values to sort in memory at once.
+chunk_size = 2 ** 22
+
+
+def external_test(data, dist, args=(), stat=ad_stat, pdist=ad_unif,
+                  chunk_size=chunk_size, dtype=float, tmpdir=None):
+    """
+    Tests goodness of fit of data to dist, using a bounded amount of memory.
+
+    The data may be given as an array (most likely a memory map) or as a path
+    to a .npy file or to a raw binary file holding values of the given dtype.
+    The statistic has to be one of `ks_stat()`, `cvm_stat()` or `ad_stat()`
+    (or a name of another `EdfStats` field, paired with a distribution).
+
+    At most about three times the chunk size of values is kept in memory; the
+    sorted runs take as much disk space (in tmpdir) as doubles as the data.
+    The result should be the same (up to rounding) as of `simple_test()`.
+    """
+    field = edf_field(stat)
+    data = _source(data, dtype)
+    dist = _frozen(data, dist, args)
+    samples = len(data)
+    accumulator = EdfAccumulator(samples)
+    if samples <= chunk_size:
+        accumulator.update(dist.cdf(sort(data)), 0)
+    else:
+        directory = mkdtemp(dir=tmpdir)
+        try:
+            runs = _write_runs(data, dist, chunk_size, directory)
+            rank = 0
+            for block in merge_runs(runs, chunk_size):
+                accumulator.update(block, rank)
+                rank += len(block)
+            del runs
+        finally:
+            rmtree(directory, ignore_errors=True)
+    statistic = getattr(accumulator.result(), field)
+    pvalue = pdist(samples).sf(statistic)
+    return GofResult(statistic, pvalue)
+
+
+def sharded_test(shards, dist, args=(), stat=ad_stat, pdist=ad_unif,
+                 workers=None, chunk_size=chunk_size):
+    """
+    Tests goodness of fit to dist of a sample split into sorted shards.
+
+    Shards should be sorted arrays (possibly memory maps), together making up
+    the sample. The distribution function is evaluated for each shard in a
+    separate thread (workers tells how many threads to use, all processors
+    by default); the uniformized shards are then merged (by `merge_runs()`,
+    in O(n log k) time for k shards), and statistics are accumulated for
+    blocks of at most chunk_size merged values in the threads.
+
+    The statistic has to be one of `ks_stat()`, `cvm_stat()` or `ad_stat()`
+    (or a name of another `EdfStats` field), as for `external_test()`.
+    """
+    field = edf_field(stat)
+    dist = _frozen(shards, dist, args)
+    samples = sum(len(shard) for shard in shards)
+    accumulator = EdfAccumulator(samples)
+    pool = ThreadPool(workers or cpu_count())
+    try:
+        uniforms = pool.map(lambda shard: parallel_cdf(dist, shard, 1),
+                            shards)
+
+        def accumulate(block):
+            values, rank = block
+            piece = EdfAccumulator(samples)
+            piece.update(values, rank)
+            return piece
+
+        blocks = _ranked(merge_runs(uniforms, chunk_size))
+        for piece in pool.imap(accumulate, blocks):
+            accumulator.merge(piece)
+    finally:
+        pool.close()
+    statistic = getattr(accumulator.result(), field)
+    pvalue = pdist(samples).sf(statistic)
+    return GofResult(statistic, pvalue)
+
+
+def _ranked(blocks):
+    """
+    Pairs consecutive blocks of a sorted sequence with their first ranks.
+    """
+    rank = 0
+    for block in blocks:
+        yield block, rank
+        rank += len(block)
+
+
+def _source(data, dtype):
+    """
+    Opens a file given by a path as a read-only memory map.
+    """
+    if isinstance(data, string_types):
+        if path.splitext(data)[1] == '.npy':
+            return load(data, mmap_mode='r')
+        return memmap(data, dtype=dtype, mode='r')
+    return data
+
+
+def _write_runs(data, dist, chunk_size, directory):
+    """
+    Sorts and uniformizes data a chunk at a time, storing results in files.
+    """
+    runs = []
+    for start in range(0, len(data), chunk_size):
+        run = dist.cdf(sort(data[start:start + chunk_size])).astype(float)
+        name = path.join(directory, 'run{}'.format(len(runs)))
+        run.tofile(name)
+        runs.append(memmap(name, dtype=float, mode='r', shape=run.shape))
+    return runs
+
+
+def merge_runs(runs, chunk_size):
+    """
+    Merges sorted arrays, yielding consecutive blocks of the sorted union.
+
+    Reads the runs through buffers of about chunk_size / len(runs) values and
+    yields blocks of at most chunk_size values.
+    """
+    size = max(1, chunk_size // len(runs))
+    positions = [0] * len(runs)
+    buffers = [run[:0] for run in runs]
+    while True:
+        # Top up buffers that are less than half full.
+        for i, run in enumerate(runs):
+            buffer, position = buffers[i], positions[i]
+            if 2 * len(buffer) < size and position < len(run):
+                fill = run[position:position + size - len(buffer)]
+                buffers[i] = concatenate((buffer, fill))
+                positions[i] += len(fill)
+        # Values up to the least of the buffered maxima of unfinished runs
+        # can be safely output, as all further values will be at least
+        # as large.
+        bound = inf
+        for buffer, position, run in zip(buffers, positions, runs):
+            if position < len(run):
+                bound = min(bound, buffer[-1])
+        pieces = []
+        for i, buffer in enumerate(buffers):
+            taken = searchsorted(buffer, bound, side='right')
+            pieces.append(buffer[:taken])
+            buffers[i] = buffer[taken:]
+        block = concatenate(pieces)
+        if len(block) == 0:
+            return
+        block.sort(kind='mergesort')
+        yield block
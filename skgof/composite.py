@@ -0,0 +1,212 @@
+"""
+Composite goodness-of-fit tests, with parameters estimated from the data.
+
+With estimated parameters the statistics tend to be smaller than for a fully
+specified distribution, so p-values from `ks_unif`, `cvm_unif` or `ad_unif`
+would be too large. Here the null distribution of the statistic is found
+by a parametric bootstrap: samples are drawn from the fitted distribution,
+parameters are estimated again for each of them and the statistic is
+computed, a batch of samples at a time (as rows of 2-D arrays, batches in
+parallel threads).
+
+For location-scale families (ones without shape parameters) the estimated
+parameters are equivariant and the null distribution does not depend on the
+true parameters, only on the family, statistic and sample count. Null
+distributions of the provided statistics are kept for such families, in
+memory and (if a cachedir is given, preferably a per-user directory) on
+disk, so after the first test of a given kind any further ones only need a
+lookup::
+
+    >>> from scipy.stats import norm
+    >>> data = norm(3, 2).rvs(size=100, random_state=1)
+    >>> result = composite_test(data, 'norm', rounds=2000, random_state=2)
+    >>> result.pvalue > .05
+    True
+
+Parameters are estimated by `estimate()`, vectorized for the normal,
+exponential, uniform and Laplace families, and with `family.fit()` (one sample
+at a time, so much more slowly) for others.
+"""
+from __future__ import division
+
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from os import fdopen, makedirs, path, rename
+from tempfile import mkstemp
+
+from numpy import (absolute, asarray, concatenate, load, median, save,
+                   searchsorted, sort)
+from numpy.random import RandomState
+from scipy._lib.six import string_types
+from scipy.stats import distributions
+
+from . import instrument
+from .ecdfgof import GofResult, ad_stat, edf_field, edf_stat
+
+# Default directory for null distributions (none, only keeping them in
+# memory), and the ones already loaded.
+cachedir = None
+null_cache = {}
+
+# Number of values in a bootstrap batch.
+batch_size = 2 ** 18
+
+
+def composite_test(data, family, stat=ad_stat, rounds=10000, workers=None,
+                   cachedir=cachedir, random_state=None):
+    """
+    Tests goodness of fit of data to a family with estimated parameters.
+
+    The family should be a SciPy distribution (or its name), the statistic
+    one of the statistic functions accepting 2-D arrays or a name of an
+    `EdfStats` field. The null distribution is simulated with rounds samples
+    (using workers threads, all processors by default); for families
+    without shape parameters and the provided statistics (the statistic
+    functions or EdfStats field names) it is kept, saved in cachedir (if
+    one is given), and reused by tests with the same family, statistic and
+    sample count. Nulls of custom statistics are simulated for each test,
+    as such statistics cannot be told apart reliably.
+
+    The p-value is the fraction of simulated statistics at least as large as
+    the data one (counting the data one as well).
+    """
+    if isinstance(family, string_types):
+        family = getattr(distributions, family)
+    data = sort(asarray(data, dtype=float))
+    params = estimate(family, data)
+    statistic = edf_stat(stat, family.cdf(data, *params))
+    null = null_distribution(family, stat, len(data), rounds, params,
+                             workers, cachedir, random_state)
+    exceeding = len(null) - searchsorted(null, statistic)
+    return GofResult(statistic, (exceeding + 1) / (len(null) + 1))
+
+
+def null_distribution(family, stat, samples, rounds, params=None,
+                      workers=None, cachedir=cachedir, random_state=None):
+    """
+    Simulates the distribution of the statistic for estimated parameters.
+
+    Samples are drawn with the given parameters (all that matters for
+    location-scale families is the family, so the standard one is used).
+    Returns a sorted array of at least rounds statistic values.
+    """
+    if family.numargs == 0:
+        params = (0, 1)
+    cached = family.numargs == 0 and _name(stat) is not None
+    if cached:
+        key = '{}-{}-{}'.format(family.name, _name(stat), samples)
+        null = _load(key, cachedir)
+        if null is not None and len(null) >= rounds:
+            return null
+    if not isinstance(random_state, RandomState):
+        random_state = RandomState(random_state)
+    rows = max(1, batch_size // samples)
+    batches = [min(rows, rounds - start) for start in range(0, rounds, rows)]
+    seeds = random_state.randint(2 ** 31, size=len(batches))
+
+    def simulate(batch):
+        count, seed = batch
+        data = family.rvs(*params, size=(count, samples), random_state=seed)
+        data.sort(axis=1)
+        estimates = estimate(family, data)
+        uniform = family.cdf(data, *[e[:, None] for e in estimates])
+        return edf_stat(stat, uniform)
+
+    pool = ThreadPool(workers or cpu_count())
+    try:
+        null = sort(concatenate(pool.map(simulate, zip(batches, seeds))))
+    finally:
+        pool.close()
+    if cached:
+        null_cache[key] = null
+        if cachedir is not None:
+            _save(key, null, cachedir)
+    return null
+
+
+def estimate(family, data):
+    """
+    Estimates parameters of a family for samples in rows of data.
+
+    Data should be sorted along the last axis; returns a tuple of parameter
+    arrays (or numbers, for a 1-D sample). These are maximum likelihood
+    estimates, except for the exponential and uniform families, for which
+    unbiased ones are used (the likelihood ones put the least or greatest
+    value at an end of the support, making the AD statistic infinite).
+    """
+    name = family.name
+    if name == 'norm':
+        return data.mean(axis=-1), data.std(axis=-1)
+    samples = data.shape[-1]
+    if name == 'expon':
+        scale = (data.mean(axis=-1) - data[..., 0]) * samples / (samples - 1)
+        return data[..., 0] - scale / samples, scale
+    if name == 'uniform':
+        spread = (data[..., -1] - data[..., 0]) / (samples - 1)
+        return data[..., 0] - spread, (samples + 1) * spread
+    if name == 'laplace':
+        loc = median(data, axis=-1)
+        return loc, absolute(data - loc[..., None]).mean(axis=-1)
+    if data.ndim == 1:
+        return family.fit(data)
+    return tuple(asarray(e) for e in zip(*[family.fit(d) for d in data]))
+
+
+def _name(stat):
+    """
+    Names the statistic for the cache key (None for custom statistics).
+    """
+    try:
+        return edf_field(stat)
+    except ValueError:
+        return None
+
+
+def _load(key, cachedir):
+    """
+    Gets a null distribution from memory or from the cache directory.
+    """
+    if key in null_cache:
+        instrument.lookup('composite_null', True)
+        return null_cache[key]
+    if cachedir is not None:
+        name = path.join(cachedir, key + '.npy')
+        null = _read(name) if path.exists(name) else None
+        if null is not None:
+            instrument.lookup('composite_null_file', True)
+            null_cache[key] = null
+            return null
+        instrument.lookup('composite_null_file', False)
+    instrument.lookup('composite_null', False)
+    return None
+
+
+def _read(name):
+    """
+    Loads a stored null distribution, if it looks like one (a sorted array of
+    floats, without pickled objects).
+    """
+    try:
+        null = load(name, allow_pickle=False)
+    except (IOError, ValueError):
+        return None
+    if null.ndim != 1 or null.dtype.kind != 'f' or \
+            not (null[1:] >= null[:-1]).all():
+        return None
+    return null
+
+
+def _save(key, null, cachedir):
+    """
+    Stores a null distribution, replacing the file atomically.
+    """
+    if not path.isdir(cachedir):
+        try:
+            makedirs(cachedir)
+        except OSError:
+            if not path.isdir(cachedir):
+                raise
+    handle, name = mkstemp(dir=cachedir, suffix='.npy')
+    with fdopen(handle, 'wb') as stream:
+        save(stream, null)
+    rename(name, path.join(cachedir, key + '.npy'))
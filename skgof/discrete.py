@@ -0,0 +1,89 @@
+"""
+Kolmogorov-Smirnov tests of fit to discrete and mixed distributions.
+
+For a distribution with jumps the statistic is no longer distribution-free
+and `ks_unif` p-values are conservative. The statistic depends on the
+distribution only through the range of its distribution function, so exact
+p-values can be calculated (see `ks_discrete_sf()`) from the values of the
+function at the atoms (and just before them); for count distributions with
+a few dozen probable values this takes milliseconds, even for samples of
+tens of thousands of values::
+
+    >>> from scipy.stats import poisson
+    >>> data = poisson(3).rvs(size=10000, random_state=1)
+    >>> ks_discrete_test(data, poisson(3))
+    GofResult(statistic=0.0056..., pvalue=0.50...)
+    >>> ks_discrete_test(data, poisson(3.1)).pvalue < .001
+    True
+
+Mixed distributions (objects with a ``cdf`` method) are supported, given the
+locations of their atoms; on continuous stretches the computation is slower,
+about the cost of a convolution per sample value.
+"""
+from __future__ import division
+
+from numpy import arange, asarray, concatenate, inf, maximum, nextafter, sort
+
+from .ecdfgof import GofResult, _frozen
+from .ksdist import ks_discrete_sf
+
+# Probability of values neglected in each tail of an unbounded support.
+tail = 1e-16
+
+
+def ks_discrete_test(data, dist, args=(), atoms=None, assume_sorted=False):
+    """
+    Tests goodness of fit to a discrete or mixed distribution.
+
+    Dist should be a (frozen) SciPy discrete distribution, or for a mixed
+    distribution any object with a ``cdf`` method, together with the points
+    at which its distribution function jumps. The data may be a 2-D array,
+    with a sample in each row; p-values are then calculated together.
+    """
+    dist = _frozen(data, dist, args)
+    data = asarray(data, dtype=float)
+    if not assume_sorted:
+        data = sort(data, axis=-1)
+    statistic = ks_discrete_stat(data, dist, assume_sorted=True)
+    lows, highs = jumps(dist, atoms)
+    pvalue = ks_discrete_sf(statistic, data.shape[-1], lows, highs)
+    return GofResult(statistic, pvalue)
+
+
+def ks_discrete_stat(data, dist, assume_sorted=False):
+    """
+    Calculates the KS statistic, allowing for jumps of the distribution.
+
+    The empirical and hypothesized functions may differ the most at a sample
+    value, or just before one. Ties do not need any special treatment, as
+    the extreme differences are found at the first and last of equal values.
+    """
+    data = asarray(data, dtype=float)
+    if not assume_sorted:
+        data = sort(data, axis=-1)
+    samples = data.shape[-1]
+    indices = arange(samples)
+    before = dist.cdf(nextafter(data, -inf))
+    d_plus = ((indices + 1) / samples - dist.cdf(data)).max(axis=-1)
+    d_minus = (before - indices / samples).max(axis=-1)
+    return maximum(d_plus, d_minus)[()]
+
+
+def jumps(dist, atoms=None):
+    """
+    Lists values of the distribution function just before and at its atoms.
+
+    Without given atoms, dist should be a SciPy discrete distribution; all
+    points of its support, except for a negligible probability in the tails
+    of an unbounded one, are taken (tail probabilities are added to the
+    first and last atom).
+    """
+    if atoms is None:
+        atoms = getattr(dist.dist, 'xk', None)
+        if atoms is None:
+            atoms = arange(dist.ppf(tail), dist.isf(tail) + 1)
+        highs = dist.cdf(atoms)
+        highs[-1] = 1
+        return concatenate(((0,), highs[:-1])), highs
+    atoms = sort(asarray(atoms, dtype=float))
+    return dist.cdf(nextafter(atoms, -inf)), dist.cdf(atoms)
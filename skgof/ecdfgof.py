@@ -27,6 +27,13 @@ specified distribution, then P(D <= 1/4) = 2/9 * (2 * 3/4 - 1)^3 = .97(2).
 In general, for sample counts less than 150 you may expect good precision
 with `ks_test()`, and a fair one above that.
 
+If only a decision at a fixed significance level is needed, pass alpha; the
+critical value is then computed once per test, sample count and level, and
+each test only compares the statistic with it::
+
+    >>> ks_test((1, 2, 3), uniform(0, 4), alpha=.05)
+    Decision(statistic=0.25, reject=False, pvalue=None)
+
 Lectures 2 and 3 of http://www.win.tue.nl/~rmcastro/AppStat2013/ list formulas
 for all three statistics. Their distributions are split into separate modules
 as calculating each is a small research story -- see `ksdist`, `cvmdist`, and
@@ -34,41 +41,60 @@ as calculating each is a small research story -- see `ksdist`, `cvmdist`, and
 """
 from __future__ import division
 
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from functools import partial
 
-from numpy import arange, log, sort
+from numpy import (arange, argpartition, asarray, bincount, concatenate,
+                   count_nonzero, cumsum, diff, dot, dtype, empty, flatnonzero,
+                   full, inf, int64, isscalar, log, maximum, multiply, nan,
+                   repeat, sort, sqrt, square, subtract, zeros)
 from scipy._lib.six import string_types
+from scipy.optimize import brentq
+from scipy.special import kolmogi
 from scipy.stats import distributions
 
+from . import instrument
 from .addist import ad_unif
 from .cvmdist import cvm_unif
-from .ksdist import ks_unif
+from .ksdist import ks_unif, ks_unif_gen
+from .parallel import parallel_cdf, parallel_sort
 
 GofResult = namedtuple('GofResult', ('statistic', 'pvalue'))
+Decision = namedtuple('Decision', ('statistic', 'reject', 'pvalue'))
+EdfStats = namedtuple('EdfStats', ('d_plus', 'd_minus', 'ks', 'kuiper', 'cvm',
+                                   'watson', 'ad'))
 
 
-def ks_stat(data):
+def ks_stat(data, workspace=None, weights=None):
     """
     Calculates the Kolmogorov-Smirnov statistic for sorted values from U(0, 1).
+
+    Weights, if given, should be positive weights of the values (in the same
+    order); see `weighted_stats()`. Without weights, the data may also be
+    a 2-D array with a sample in each row (for this and the other statistic
+    functions), giving an array of statistics.
     """
-    samples = len(data)
-    uniform = arange(0, samples + 1) / samples
-    d_plus = (uniform[1:] - data).max()
-    d_minus = (data - uniform[:-1]).max()
-    return max(d_plus, d_minus)
+    if weights is not None:
+        return weighted_stats(data, weights).ks
+    data, work, grid = _prepare(data, workspace, 'uniform')
+    d_plus = subtract(grid[1:], data, out=work).max(axis=-1)
+    d_minus = subtract(data, grid[:-1], out=work).max(axis=-1)
+    return maximum(d_plus, d_minus)
 
 
-def cvm_stat(data):
+def cvm_stat(data, workspace=None, weights=None):
     """
     Calculates the Cramer-von Mises statistic for sorted values from U(0, 1).
     """
-    samples2 = 2 * len(data)
-    minuends = arange(1, samples2, 2) / samples2
-    return 1 / (6 * samples2) + ((minuends - data) ** 2).sum()
+    if weights is not None:
+        return weighted_stats(data, weights).cvm
+    data, work, grid = _prepare(data, workspace, 'minuends')
+    subtract(grid, data, out=work)
+    return (work.dtype.type(1 / (12 * data.shape[-1])) +
+            square(work, out=work).sum(axis=-1))
 
 
-def ad_stat(data):
+def ad_stat(data, workspace=None, weights=None):
     """
     Calculates the Anderson-Darling statistic for sorted values from U(0, 1).
 
@@ -76,15 +102,634 @@ def ad_stat(data):
     will get infinity as a result and a divide-by-zero warning for such values.
     The warning can be silenced or raised using numpy.errstate(divide=...).
     """
-    samples = len(data)
-    factors = arange(1, 2 * samples, 2)
-    return -samples - (factors * log(data * (1 - data[::-1]))).sum() / samples
+    if weights is not None:
+        return weighted_stats(data, weights).ad
+    data, work, _ = _prepare(data, workspace)
+    return work.dtype.type(_ad_sum(data, work))
+
+
+def _ad_sum(data, work):
+    """
+    Calculates the AD statistic for sorted data, using work for the logs.
+
+    The weighted sum of logs is about -n^2 and gets reduced by about n^2, so
+    for single precision data the logs and their sum are computed in double
+    precision (a chunk at a time, to avoid a full-size temporary).
+    """
+    samples = data.shape[-1]
+    factors = _grid('factors', samples, float)
+    if work.dtype == float:
+        subtract(1, data[..., ::-1], out=work)
+        log(multiply(data, work, out=work), out=work)
+        return -samples - dot(work, factors) / samples
+    reverse = data[..., ::-1]
+    total = 0
+    for start in range(0, samples, chunk_size):
+        stop = start + chunk_size
+        logs = log(data[..., start:stop] *
+                   (1 - reverse[..., start:stop].astype(float)))
+        total = total + dot(logs, factors[start:stop])
+    return -samples - total / samples
+
+
+def edf_stats(data, workspace=None):
+    """
+    Calculates a range of EDF statistics for sorted values from U(0, 1).
+
+    Computes the one-sided Kolmogorov-Smirnov statistics (D+ and D-), the
+    two-sided one (D), Kuiper's V, Cramer-von Mises W^2, Watson's U^2 and
+    Anderson-Darling A^2, sharing index grids and a single working array among
+    them. This is less costly than running the separate statistic functions,
+    if you need more than one statistic for a large sample.
+
+    The ks, cvm and ad fields are (up to rounding) what ks_stat(), cvm_stat()
+    and ad_stat() would return, and may be used with the respective
+    distributions from ksdist, cvmdist and addist.
+
+    As the statistic functions, this also accepts a 2-D array holding a number
+    of equally sized samples in rows, giving arrays of statistics.
+    """
+    data, work, uniform = _prepare(data, workspace, 'uniform')
+    samples = data.shape[-1]
+    d_plus = subtract(uniform[1:], data, out=work).max(axis=-1)
+    d_minus = subtract(data, uniform[:-1], out=work).max(axis=-1)
+    subtract(_grid('minuends', samples, work.dtype), data, out=work)
+    cvm = 1 / (12 * samples) + square(work, out=work).sum(axis=-1)
+    watson = cvm - samples * (data.sum(axis=-1) / samples - .5) ** 2
+    ad = _ad_sum(data, work).astype(work.dtype)[()]
+    return EdfStats(d_plus, d_minus, maximum(d_plus, d_minus),
+                    d_plus + d_minus, cvm, watson, ad)
+
+
+def grouped_stats(data, counts, samples=None):
+    """
+    Calculates EDF statistics for distinct sorted values with multiplicities.
+
+    Data should be increasing values from U(0, 1) and counts should tell how
+    many times each of them occurs in the sample. The result is what
+    `edf_stats()` would give (up to rounding) for the sample with every value
+    repeated count times, but takes time proportional to the number of
+    distinct values.
+
+    Counts do not need to be integers, they are normalized to give jumps of
+    the empirical function. Samples, the sample count used to scale the CvM,
+    Watson and AD statistics, defaults to the sum of counts.
+    """
+    data = asarray(data, dtype=float)
+    counts = asarray(counts)
+    total = counts.sum()
+    if samples is None:
+        samples = total
+    # Empirical function values before and after each of the jumps.
+    cumulative = cumsum(counts)
+    highs = cumulative / total
+    lows = (cumulative - counts) / total
+    d_plus = (highs - data).max()
+    d_minus = (data - lows).max()
+    # With p_i the jump sizes and m_i the middles of jumps: the CvM integral
+    # is the sum of p_i (m_i - u_i)^2 + p_i^3 / 12, the AD one is -1 minus
+    # twice the sum of p_i (m_i log u_i + (1 - m_i) log(1 - u_i)).
+    jumps = counts / total
+    middles = (lows + highs) / 2
+    cvm = samples * (dot(jumps, (middles - data) ** 2) +
+                     dot(jumps, jumps ** 2) / 12)
+    watson = cvm - samples * (dot(jumps, data) - .5) ** 2
+    ad = -samples - 2 * samples * dot(jumps, middles * log(data) +
+                                      (1 - middles) * log(1 - data))
+    return EdfStats(d_plus, d_minus, max(d_plus, d_minus), d_plus + d_minus,
+                    cvm, watson, ad)
+
+
+def weighted_stats(data, weights):
+    """
+    Calculates EDF statistics for sorted values from U(0, 1) with weights.
+
+    The empirical function jumps by the normalized weight of each value, and
+    the CvM, Watson and AD statistics are scaled by the Kish effective sample
+    size (see `effective_size()`), under which their distributions should
+    approximately match the ones for unweighted samples of that size.
+    """
+    return grouped_stats(data, weights, effective_size(weights))
+
+
+def effective_size(weights):
+    """
+    Calculates the Kish effective sample size, (sum w)^2 / sum w^2.
+    """
+    weights = asarray(weights, dtype=float)
+    return weights.sum() ** 2 / dot(weights, weights)
+
+
+# Index grids for the most recently used sample counts and types.
+grid_cache = OrderedDict()
+grid_cache_size = 8
+
+
+def _grid(kind, samples, float_type):
+    """
+    Returns a cached, read-only grid of values for the given sample count.
+
+    The uniform grid holds i / n for i = 0, ..., n, the minuends grid holds
+    (2i + 1) / 2n and the factors grid 2i + 1, for i = 0, ..., n - 1.
+    """
+    # Types are normalized, so that float and dtype(float) share a grid.
+    key = (kind, samples, dtype(float_type))
+    instrument.lookup('grid', key in grid_cache)
+    try:
+        grid = grid_cache.pop(key)
+    except KeyError:
+        # Divided in place, to avoid a second full-size temporary.
+        if kind == 'uniform':
+            grid = arange(0, samples + 1, dtype=float)
+            grid /= samples
+        elif kind == 'minuends':
+            grid = arange(1, 2 * samples, 2, dtype=float)
+            grid /= 2 * samples
+        else:
+            grid = arange(1, 2 * samples, 2, dtype=float)
+        grid = grid.astype(float_type, copy=False)
+        grid.flags.writeable = False
+        while len(grid_cache) >= grid_cache_size:
+            grid_cache.popitem(last=False)
+    grid_cache[key] = grid
+    return grid
+
+
+def _prepare(data, workspace, kind=None):
+    """
+    Gets the working array and a grid (of the kind given) for a statistic.
+
+    Single precision data is kept in single precision, anything that is not
+    a float array gets converted to double precision. The workspace, if given,
+    should be a writable, contiguous array with at least as many elements as
+    the data, of the same float type; otherwise a new working array is
+    allocated. Data may be a 2-D array with samples in rows.
+    """
+    data = asarray(data)
+    if data.dtype.kind != 'f':
+        data = data.astype(float)
+    if workspace is None:
+        work = empty(data.shape, data.dtype)
+    else:
+        work = workspace.reshape(-1)[:data.size].reshape(data.shape)
+    grid = None if kind is None else _grid(kind, data.shape[-1], data.dtype)
+    return data, work, grid
+
+
+class EdfAccumulator(object):
+    """
+    Calculates EDF statistics from pieces of a sorted, uniformized sample.
+
+    Pieces are given together with the ranks of their values in the whole
+    sorted sample (or just the rank of the first value, if the piece is
+    contiguous), and may be passed in any order or accumulated separately and
+    merged. The result is what `edf_stats()` would give for the whole sample
+    (up to rounding). For example::
+
+        >>> from numpy import array
+        >>> acc = EdfAccumulator(4)
+        >>> acc.update(array((.625, .875)), 2)
+        >>> acc.update(array((.125, .375)), 0)
+        >>> acc.result().ks
+        0.125
+    """
+    def __init__(self, samples):
+        self.samples = samples
+        self.d_plus = self.d_minus = -inf
+        self.squares = self.total = self.logs = 0.
+
+    def update(self, data, ranks):
+        """
+        Adds values to the statistics, given their ranks or the first rank.
+        """
+        if len(data) == 0:
+            return
+        samples = self.samples
+        if isscalar(ranks):
+            ranks = arange(ranks, ranks + len(data))
+        lows = ranks / samples
+        self.d_plus = max(self.d_plus, ((ranks + 1) / samples - data).max())
+        self.d_minus = max(self.d_minus, (data - lows).max())
+        factors = 2 * ranks + 1
+        self.squares += ((factors / (2 * samples) - data) ** 2).sum()
+        self.total += data.sum()
+        self.logs += (dot(factors, log(data)) +
+                      dot(2 * samples - factors, log(1 - data)))
+
+    def merge(self, other):
+        """
+        Adds statistics accumulated for another piece of the same sample.
+        """
+        self.d_plus = max(self.d_plus, other.d_plus)
+        self.d_minus = max(self.d_minus, other.d_minus)
+        self.squares += other.squares
+        self.total += other.total
+        self.logs += other.logs
+
+    def result(self):
+        """
+        Gives the statistics for all the values added so far.
+        """
+        samples = self.samples
+        d_plus, d_minus = self.d_plus, self.d_minus
+        cvm = 1 / (12 * samples) + self.squares
+        watson = cvm - samples * (self.total / samples - .5) ** 2
+        ad = -samples - self.logs / samples
+        return EdfStats(d_plus, d_minus, max(d_plus, d_minus),
+                        d_plus + d_minus, cvm, watson, ad)
+
+
+def edf_field(stat):
+    """
+    Tells which of the EdfStats fields corresponds to the statistic function.
+    """
+    for field, function in (('ks', ks_stat), ('cvm', cvm_stat),
+                            ('ad', ad_stat)):
+        if stat is function:
+            return field
+    if stat in EdfStats._fields:
+        return stat
+    raise ValueError("Only statistics provided by edf_stats() are supported.")
+
+
+def edf_stat(stat, data):
+    """
+    Computes a statistic, a function or an EdfStats field name, for data.
+
+    Data should be sorted values from U(0, 1), or a 2-D array of them.
+    """
+    if callable(stat):
+        return stat(data)
+    return getattr(edf_stats(data), edf_field(stat))
 
 
 def simple_test(data, dist, args=(), stat=ad_stat, pdist=ad_unif,
-                assume_sorted=False):
+                assume_sorted=False, check_sorted=False,
+                overwrite_input=False, workers=1, compress=None, weights=None,
+                alpha=None, rejected_pvalue=False, lazy=False):
     """
     Tests goodness of fit of data to dist using a distribution-free statistic.
+
+    Arrays, memory maps and other objects exposing the buffer interface are
+    used without copying. Data that is not assumed to be sorted is sorted into
+    a new array, and then replaced, in chunks, by the distribution function
+    values (if it is a double precision array), so the peak memory use is
+    about twice the size of the data (and one more for the first test of a
+    sample count, that creates a cached grid of statistic terms).
+
+    With overwrite_input the given array is sorted in place and gets the
+    function values (if it holds double precision floats, otherwise they go
+    to a new array), avoiding any full-size allocations; the array should be
+    writable and its contents are lost. With check_sorted
+    data assumed to be sorted is checked to be (raising a ValueError if not).
+
+    Workers tells how many threads to sort the data and evaluate the function
+    with (None meaning one per processor), see `skgof.parallel`. A parallel
+    sort needs a new array even with overwrite_input (using the input as
+    scratch space).
+
+    Samples with many repeated values are reduced to distinct values with
+    their counts, evaluating the distribution function once per value (and
+    computing the statistic with `grouped_stats()`, if it is one of those
+    it provides). By default this is done when there are at least
+    compress_ratio times fewer distinct values than samples; pass compress
+    as True or False to force or to disable it. Integer data with a range not
+    exceeding the sample count is counted without sorting (unless it is to be
+    sorted in place).
+
+    Weights, if given, should be positive weights of the values (such as
+    inverse inclusion probabilities of a sample drawn from a larger one). The
+    statistic function is then called with a weights keyword argument (see
+    `weighted_stats()`) and the p-value is computed for the rounded effective
+    sample size. Weighted samples are sorted serially and not compressed.
+
+    With alpha, the test only decides whether to reject the hypothesis at
+    that significance level (if the p-value would be less than alpha), by
+    comparing the statistic with a cached `critical_value()`. A Decision
+    is then returned, with the p-value only computed for rejected samples
+    with rejected_pvalue (and None otherwise).
+
+    With lazy, a `LazyResult` is returned, computing the p-value only when
+    it is first accessed.
+
+    Data may also be a 2-D array holding a batch of samples of the same size
+    in rows, giving arrays of statistics and p-values (or decisions). Rows
+    are sorted and evaluated serially, without compression or weights.
+    """
+    phases = instrument.phases()
+    dist = _frozen(data, dist, args)
+    data = asarray(data)
+    if assume_sorted and check_sorted and not is_sorted(data):
+        raise ValueError("Data is not sorted.")
+    result = partial(_result, alpha=alpha, rejected_pvalue=rejected_pvalue,
+                     lazy=lazy)
+    batch = data.ndim > 1
+    if batch and weights is not None:
+        raise ValueError("Weights are only supported for a single sample.")
+    if weights is not None:
+        return phases.mark('weighted', _weighted_test(
+            data, weights, dist, stat, pdist, assume_sorted, result))
+    if assume_sorted:
+        writable = overwrite_input and data.dtype == float
+    elif batch:
+        if overwrite_input:
+            data.sort(axis=-1)
+        else:
+            data = sort(data, axis=-1)
+        phases.mark('sort')
+        writable = False
+    elif compress is not False and not overwrite_input and _countable(data):
+        grouped = phases.mark('count', _counted(data))
+        return phases.mark('grouped', _grouped_test(dist, grouped, stat,
+                                                    pdist, result))
+    else:
+        data = phases.mark('sort', parallel_sort(data, workers,
+                                                 overwrite_input))
+        writable = data.dtype == float
+    if compress is not False and not batch:
+        grouped = phases.mark('runs', _runs(data, compress))
+        if grouped is not None:
+            return phases.mark('grouped', _grouped_test(dist, grouped, stat,
+                                                        pdist, result))
+    if batch:
+        uniform = phases.mark('cdf', dist.cdf(data))
+    else:
+        uniform = phases.mark('cdf', parallel_cdf(
+            dist, data, workers, out=data if writable else None))
+    statistic = phases.mark('statistic', stat(uniform))
+    return phases.mark('pvalue', result(statistic, pdist, data.shape[-1]))
+
+
+def _result(statistic, pdist, samples, alpha=None, rejected_pvalue=False,
+            lazy=False):
+    """
+    Computes the p-value (now or when needed), or decides at the alpha level.
+    """
+    if alpha is None:
+        if lazy:
+            return LazyResult(statistic, partial(_sf, pdist, samples))
+        return GofResult(statistic, pdist(samples).sf(statistic))
+    reject = statistic > critical_value(pdist, samples, alpha)
+    if not rejected_pvalue or not asarray(reject).any():
+        pvalue = None
+    elif isscalar(reject) or reject.ndim == 0:
+        pvalue = pdist(samples).sf(statistic)
+    else:
+        # P-values of a batch are only computed for rejected samples.
+        pvalue = full(reject.shape, nan)
+        pvalue[reject] = pdist(samples).sf(statistic[reject])
+    return Decision(statistic, reject, pvalue)
+
+
+def _sf(pdist, samples, statistic):
+    return pdist(samples).sf(statistic)
+
+
+class LazyResult(object):
+    """
+    A test result with the p-value computed when it is first needed.
+
+    Unpacks, indexes and compares as a (statistic, pvalue) `GofResult`.
+    Sf should calculate p-values for an array of statistics. For an array
+    of statistics (of a batch of tests), `select()` gives the results for
+    some of the tests, computing the missing p-values in a single call.
+    """
+    _fields = GofResult._fields
+
+    def __init__(self, statistic, sf):
+        self.statistic = statistic
+        self.sf = sf
+        self._pvalue = None
+        self._known = None
+
+    @property
+    def pvalue(self):
+        if asarray(self.statistic).ndim == 0:
+            if self._pvalue is None:
+                self._pvalue = self.sf(self.statistic)
+            return self._pvalue
+        return self.select(Ellipsis).pvalue
+
+    def select(self, indices):
+        """
+        Gives the statistics and p-values of a subset of tests.
+        """
+        statistics = asarray(self.statistic)
+        if self._known is None:
+            self._pvalue = empty(statistics.shape)
+            self._known = zeros(statistics.shape, bool)
+        missing = zeros(statistics.shape, bool)
+        missing[indices] = True
+        missing &= ~self._known
+        if missing.any():
+            self._pvalue[missing] = self.sf(statistics[missing])
+            self._known |= missing
+        return GofResult(statistics[indices], self._pvalue[indices])
+
+    def largest(self, count):
+        """
+        Finds indices of the tests with the greatest statistics, decreasing.
+        """
+        statistics = asarray(self.statistic).ravel()
+        count = min(count, len(statistics))
+        if count == 0:
+            return arange(0)
+        indices = argpartition(statistics, len(statistics) - count)
+        indices = indices[len(statistics) - count:]
+        return indices[statistics[indices].argsort(kind='mergesort')[::-1]]
+
+    def _asdict(self):
+        return OrderedDict(zip(self._fields, self))
+
+    def __iter__(self):
+        yield self.statistic
+        yield self.pvalue
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        if index in (0, -2):
+            return self.statistic
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'LazyResult(statistic={!r}, pvalue={!r})'.format(*self)
+
+
+# Critical values by statistic distribution, sample count and level, for
+# the most recently used ones.
+critical_cache = OrderedDict()
+critical_cache_size = 256
+
+
+def critical_value(pdist, samples, alpha):
+    """
+    Finds (or recalls) the statistic value with the given p-value.
+
+    The root is bracketed around the asymptotic value with Stephens'
+    correction for `ks_unif` variants (or by doubling steps from one for other
+    distributions) and found by Brent's method, so it takes about a dozen
+    evaluations of the survival function, staying close to the root.
+    """
+    key = (pdist, samples, alpha)
+    instrument.lookup('critical', key in critical_cache)
+    try:
+        value = critical_cache.pop(key)
+    except KeyError:
+        dist = pdist(samples)
+        if isinstance(pdist, ks_unif_gen):
+            root = sqrt(samples)
+            guess = kolmogi(alpha) / (root + .12 + .11 / root)
+        else:
+            guess = 1.
+
+        def excess(statistic):
+            return dist.sf(statistic) - alpha
+
+        low, high = guess / 1.25, guess * 1.25
+        while excess(low) < 0:
+            low /= 2
+        while excess(high) > 0:
+            high *= 2
+        value = brentq(excess, low, high, xtol=1e-14)
+        while len(critical_cache) >= critical_cache_size:
+            critical_cache.popitem(last=False)
+    critical_cache[key] = value
+    return value
+
+
+def clear_caches():
+    """
+    Drops cached critical values and statistic grids.
+
+    Critical values are not recomputed when a distribution changes, for
+    instance a custom one, so its cached values should be cleared then.
+    """
+    critical_cache.clear()
+    grid_cache.clear()
+
+
+# Least ratio of samples to distinct values, for samples to be compressed.
+compress_ratio = 4
+
+
+def _countable(data):
+    """
+    Tells if integer data spans a range small enough for a counting sort.
+    """
+    if data.dtype.kind not in 'iu' or len(data) == 0:
+        return False
+    return int(data.max()) - int(data.min()) <= len(data)
+
+
+def _counted(data):
+    """
+    Counts occurrences of integers, returning distinct values and counts.
+    """
+    low = int(data.min())
+    counts = bincount(subtract(data, low, dtype=int64))
+    values = flatnonzero(counts)
+    return values + low, counts[values]
+
+
+def _runs(data, compress):
+    """
+    Finds runs of equal values in sorted data, returning values and lengths.
+
+    Returns None, unless forced, if there are not enough repeated values.
+    """
+    if len(data) == 0:
+        return None
+    if not compress:
+        # Distinct values are counted a chunk at a time, to avoid full-size
+        # temporaries for data that is not going to be compressed.
+        distinct = 1
+        for start in range(0, len(data) - 1, chunk_size):
+            stop = min(start + chunk_size + 1, len(data))
+            distinct += count_nonzero(data[start + 1:stop] !=
+                                      data[start:stop - 1])
+            if compress_ratio * distinct > len(data):
+                return None
+    starts = concatenate(((0,), flatnonzero(data[1:] != data[:-1]) + 1))
+    lengths = diff(concatenate((starts, (len(data),))))
+    return data[starts], lengths
+
+
+def _weighted_test(data, weights, dist, stat, pdist, assume_sorted,
+                   result=_result):
+    """
+    Computes a statistic and its p-value for a sample with weights.
+    """
+    weights = asarray(weights)
+    if not assume_sorted:
+        order = data.argsort(kind='mergesort')
+        data, weights = data[order], weights[order]
+    statistic = stat(dist.cdf(data), weights=weights)
+    return result(statistic, pdist, int(round(effective_size(weights))))
+
+
+def _grouped_test(dist, grouped, stat, pdist, result=_result):
+    """
+    Computes a statistic and its p-value for values with multiplicities.
+    """
+    values, counts = grouped
+    uniform = dist.cdf(values)
+    try:
+        statistic = getattr(grouped_stats(uniform, counts), edf_field(stat))
+    except ValueError:
+        statistic = stat(repeat(uniform, counts))
+    return result(statistic, pdist, counts.sum())
+
+
+def grouped_test(data, counts, dist, args=(), stat=ad_stat, pdist=ad_unif,
+                 assume_sorted=False):
+    """
+    Tests goodness of fit to dist of values given with their multiplicities.
+
+    Data holds the (preferably distinct) values and counts how many times each
+    of them was observed. The distribution function is only evaluated once per
+    value and the statistic is computed by `grouped_stats()`, so the cost does
+    not depend on the sample count, that is used for the p-value. The
+    statistic has to be one of `ks_stat()`, `cvm_stat()` or `ad_stat()` (or a
+    name of another `EdfStats` field, paired with a distribution).
+    """
+    edf_field(stat)
+    dist = _frozen(data, dist, args)
+    data, counts = asarray(data), asarray(counts)
+    if not assume_sorted:
+        order = data.argsort(kind='mergesort')
+        data, counts = data[order], counts[order]
+    return _grouped_test(dist, (data, counts), stat, pdist)
+
+
+# Number of elements to check at once, bounding temporary allocations.
+chunk_size = 2 ** 16
+
+
+def is_sorted(data):
+    """
+    Checks if the array is sorted, without allocating a full-size temporary.
+
+    Rows of a 2-D array are checked to be sorted each.
+    """
+    samples = data.shape[-1]
+    for start in range(0, samples - 1, chunk_size):
+        stop = min(start + chunk_size + 1, samples)
+        if (data[..., start + 1:stop] < data[..., start:stop - 1]).any():
+            return False
+    return True
+
+
+def _frozen(data, dist, args):
+    """
+    Validates simple test arguments, returning the hypothesized distribution.
     """
     if isinstance(data, string_types):
         # Auto-generating samples from a named distribution is not supported.
@@ -93,13 +738,91 @@ def simple_test(data, dist, args=(), stat=ad_stat, pdist=ad_unif,
         dist = getattr(distributions, dist)(*args)
     elif args:
         dist = dist(args)
-    if not assume_sorted:
-        data = sort(data)
-    statistic = stat(dist.cdf(data))
-    pvalue = pdist(len(data)).sf(statistic)
-    return GofResult(statistic, pvalue)
+    return dist
 
 
 ks_test = partial(simple_test, stat=ks_stat, pdist=ks_unif)
 cvm_test = partial(simple_test, stat=cvm_stat, pdist=cvm_unif)
 ad_test = partial(simple_test, stat=ad_stat, pdist=ad_unif)
+
+
+class PreparedSample(object):
+    """
+    A sample readied for running a number of tests against one distribution.
+
+    Sorting the data and evaluating the distribution function on it are each
+    done at most once, when first needed, and shared by all the tests::
+
+        >>> from scipy.stats import uniform
+        >>> sample = PreparedSample((3, 1, 2), uniform(0, 4))
+        >>> sample.ks()
+        GofResult(statistic=0.25, pvalue=0.97222...)
+        >>> sample.cvm()
+        GofResult(statistic=0.04166..., pvalue=0.95...)
+
+    If you already have the values of the distribution function (because the
+    data was generated through its inverse or the function is costly and
+    computed elsewhere), use `from_uniform()` to skip the evaluation.
+    """
+    def __init__(self, data, dist, args=(), assume_sorted=False):
+        self.dist = _frozen(data, dist, args)
+        self._data = data
+        self._sorted = assume_sorted
+        self._uniform = None
+
+    @classmethod
+    def from_uniform(cls, uniform, assume_sorted=False):
+        """
+        Prepares a sample from hypothesized distribution function values.
+        """
+        sample = cls.__new__(cls)
+        sample.dist = None
+        sample._data = None
+        sample._sorted = True
+        sample._uniform = uniform if assume_sorted else sort(uniform)
+        return sample
+
+    @property
+    def data(self):
+        """
+        Sorted sample values (not available for uniformized samples).
+        """
+        if not self._sorted:
+            self._data = sort(self._data)
+            self._sorted = True
+        return self._data
+
+    @property
+    def uniform(self):
+        """
+        Sorted values of the distribution function on the sample.
+        """
+        if self._uniform is None:
+            self._uniform = self.dist.cdf(self.data)
+        return self._uniform
+
+    def __len__(self):
+        return len(self.uniform if self._data is None else self._data)
+
+    def test(self, stat=ad_stat, pdist=ad_unif):
+        """
+        Calculates the given statistic and its p-value for the sample.
+        """
+        statistic = stat(self.uniform)
+        pvalue = pdist(len(self)).sf(statistic)
+        return GofResult(statistic, pvalue)
+
+    def stats(self):
+        """
+        Calculates all statistics offered by `edf_stats()` for the sample.
+        """
+        return edf_stats(self.uniform)
+
+    def ks(self):
+        return self.test(ks_stat, ks_unif)
+
+    def cvm(self):
+        return self.test(cvm_stat, cvm_unif)
+
+    def ad(self):
+        return self.test(ad_stat, ad_unif)
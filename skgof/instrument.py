@@ -0,0 +1,165 @@
+"""
+Opt-in instrumentation of the tests.
+
+Within an `instrumented()` block, `simple_test()` times its phases (sorting
+or counting, the search for runs of ties, distribution function evaluation,
+the statistic and the p-value), `ks_unif` counts the methods it calculates
+with (and the orders of Durbin matrices), and caches of critical values,
+grids and simulated null distributions count their hits and misses. Outside
+of such a block the hooks only check that no recorder is active::
+
+    >>> from scipy.stats import norm
+    >>> from skgof import ks_test
+    >>> data = norm.rvs(size=1000, random_state=1)
+    >>> with instrumented() as recorder:
+    ...     result = ks_test(data, norm)
+    >>> report = recorder.as_dict()
+    >>> sorted(report['timings'])
+    ['cdf', 'pvalue', 'runs', 'sort', 'statistic']
+    >>> report['counters']['ks_unif.method']
+    {'durbin': 1}
+
+The report is a dictionary of plain numbers and strings, that `to_json()`
+serializes for forwarding to a metrics system. The recorder is shared by all
+threads (updates are locked), so parallel calculations are included.
+"""
+from __future__ import division
+
+from contextlib import contextmanager
+from threading import Lock
+from timeit import default_timer
+import json
+
+# The active recorder, if instrumentation is enabled.
+recorder = None
+
+
+class Recorder(object):
+    """
+    Collects phase timings, counters, histograms and cache lookups.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.clear()
+
+    def clear(self):
+        # Counts, total and longest times by phase.
+        self.timings = {}
+        # Counts by value, by counter name.
+        self.counters = {}
+        # Counts by (power of two) upper bound of values, by histogram name.
+        self.histograms = {}
+        # Hits and misses by cache name.
+        self.caches = {}
+
+    def time(self, phase, seconds):
+        with self.lock:
+            timing = self.timings.setdefault(phase, [0, 0., 0.])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    def count(self, name, value):
+        with self.lock:
+            counter = self.counters.setdefault(name, {})
+            counter[value] = counter.get(value, 0) + 1
+
+    def observe(self, name, value):
+        bound = 1 << (max(int(value), 1) - 1).bit_length()
+        with self.lock:
+            histogram = self.histograms.setdefault(name, {})
+            histogram[bound] = histogram.get(bound, 0) + 1
+
+    def lookup(self, cache, hit):
+        with self.lock:
+            lookups = self.caches.setdefault(cache, [0, 0])
+            lookups[0 if hit else 1] += 1
+
+    def as_dict(self):
+        """
+        Gives the collected values as a dictionary of dictionaries.
+        """
+        with self.lock:
+            timings = {phase: {'count': count, 'total': total,
+                               'longest': longest}
+                       for phase, (count, total, longest) in
+                       self.timings.items()}
+            caches = {cache: {'hits': hits, 'misses': misses,
+                              'rate': hits / (hits + misses)}
+                      for cache, (hits, misses) in self.caches.items()}
+            return {'timings': timings,
+                    'counters': {name: dict(counter) for name, counter in
+                                 self.counters.items()},
+                    'histograms': {name: dict(histogram) for name, histogram
+                                   in self.histograms.items()},
+                    'caches': caches}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), sort_keys=True, **kwargs)
+
+
+@contextmanager
+def instrumented(active=None):
+    """
+    Enables instrumentation within a block, giving the recorder.
+
+    A new recorder is created unless one is given (to accumulate values
+    over a few blocks). The previously active recorder is restored after
+    the block.
+    """
+    global recorder
+    previous = recorder
+    recorder = Recorder() if active is None else active
+    try:
+        yield recorder
+    finally:
+        recorder = previous
+
+
+def count(name, value):
+    if recorder is not None:
+        recorder.count(name, value)
+
+
+def observe(name, value):
+    if recorder is not None:
+        recorder.observe(name, value)
+
+
+def lookup(cache, hit):
+    if recorder is not None:
+        recorder.lookup(cache, hit)
+
+
+def phases():
+    """
+    Gives a timer for consecutive phases of a calculation.
+    """
+    return _idle if recorder is None else Phases(recorder)
+
+
+class Phases(object):
+    """
+    Records the time since the previous mark (or creation) for each mark.
+    """
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.last = default_timer()
+
+    def mark(self, phase, value=None):
+        """
+        Ends a phase; passes the value through (for use in return lines).
+        """
+        now = default_timer()
+        self.recorder.time(phase, now - self.last)
+        self.last = now
+        return value
+
+
+class _Idle(object):
+    @staticmethod
+    def mark(phase, value=None):
+        return value
+
+
+_idle = _Idle()
@@ -0,0 +1,218 @@
+"""
+Two-dimensional Kolmogorov-Smirnov tests (after Peacock, and Fasano and
+Franceschini).
+
+The statistic is the greatest difference between the fractions of points in
+any of the four quadrants around a sample point and the reference
+probabilities of the quadrants (or the fractions of points of a second
+sample). Counting points in the quadrants around every point takes a sort
+by one coordinate and a merge-sort tree over the ranks of the other one, for
+O(n log^2 n) vectorized operations rather than O(n^2); the reference
+probabilities of all quadrants come from a single call to the distribution
+function, evaluated at the points and at the points projected to infinity.
+
+The statistic is not distribution-free, but depends little on the reference
+distribution (mainly through the correlation of coordinates). P-values are
+estimated from a null distribution simulated for independent uniform
+coordinates (see `skgof.testsim`), which is exact for references with
+independent coordinates; simulated distributions are cached per sample count::
+
+    >>> from scipy.stats import multivariate_normal
+    >>> reference = multivariate_normal((0, 0), ((1, .3), (.3, 1)))
+    >>> data = reference.rvs(size=500, random_state=1)
+    >>> ks2d_test(data, reference, random_state=1).pvalue > .05
+    True
+    >>> other = multivariate_normal((0, .3), ((1, .3), (.3, 1)))
+    >>> ks2d_test(other.rvs(size=500, random_state=2), reference,
+    ...           random_state=1).pvalue < .05
+    True
+"""
+from __future__ import division
+
+from numpy import (absolute, arange, asarray, atleast_2d, concatenate, cumsum,
+                   empty_like, inf, int64, maximum, ones, put_along_axis,
+                   searchsorted, sort, stack, take_along_axis, zeros)
+
+from . import instrument
+from .ecdfgof import GofResult
+from .testsim import simulator
+
+# Simulated statistics (sorted) by sample counts and number of rounds.
+null_cache = {}
+
+
+def ks2d_test(data, dist, rounds=1000, random_state=None):
+    """
+    Tests goodness of fit of 2-D points to a bivariate distribution.
+
+    Data should be an array of points (of shape (n, 2)); dist should have a
+    ``cdf`` method accepting such arrays (as SciPy's multivariate normal
+    distribution does). The p-value is estimated from the given number of
+    rounds of simulation.
+    """
+    data = asarray(data, dtype=float)
+    statistic = ks2d_stat(data, dist)
+    null = ks2d_null(data.shape[-2], rounds, random_state)
+    return GofResult(statistic, _pvalue(null, statistic))
+
+
+def ks2d_2samp_test(first, second, rounds=1000, random_state=None):
+    """
+    Tests whether two sets of 2-D points come from the same distribution.
+    """
+    first, second = asarray(first, dtype=float), asarray(second, dtype=float)
+    statistic = ks2d_2samp_stat(first, second)
+    null = ks2d_null((len(first), len(second)), rounds, random_state)
+    return GofResult(statistic, _pvalue(null, statistic))
+
+
+def ks2d_stat(data, dist):
+    """
+    Calculates the one-sample 2-D statistic.
+
+    Data may also be a batch of samples (of shape (rows, n, 2)).
+    """
+    data = asarray(data, dtype=float)
+    x, y = data[..., 0], data[..., 1]
+    samples = x.shape[-1]
+    margins = (stack((x, inf + y), -1), stack((inf + x, y), -1))
+    points = concatenate((data,) + margins, axis=-2)
+    probabilities = asarray(dist.cdf(points.reshape(-1, 2)))
+    probabilities = probabilities.reshape(points.shape[:-1])
+    joint, first, second = (probabilities[..., i * samples:(i + 1) * samples]
+                            for i in range(3))
+    quadrants = quadrant_counts(x, y)
+    probabilities = (joint, first - joint, second - joint,
+                     1 - first - second + joint)
+    differences = maximum.reduce([absolute(count / samples - probability)
+                                  for count, probability in
+                                  zip(quadrants, probabilities)])
+    return differences.max(axis=-1)[()]
+
+
+def ks2d_2samp_stat(first, second):
+    """
+    Calculates the two-sample 2-D statistic of Fasano and Franceschini.
+
+    The statistic is the average of the greatest differences of quadrant
+    fractions around points of the first and of the second sample. Samples
+    may also be batches (of shapes (rows, n, 2) and (rows, m, 2)).
+    """
+    first, second = asarray(first, dtype=float), asarray(second, dtype=float)
+    points = concatenate((first, second), axis=-2)
+    n, m = first.shape[-2], second.shape[-2]
+    labels = concatenate((ones(n, bool), zeros(m, bool)))
+    x, y = points[..., 0], points[..., 1]
+    counts = quadrant_counts(x, y, labels)
+    others = [total - count for total, count in
+              zip(quadrant_counts(x, y), counts)]
+    differences = maximum.reduce([absolute(count / n - other / m)
+                                  for count, other in zip(counts, others)])
+    return ((differences[..., :n].max(axis=-1) +
+             differences[..., n:].max(axis=-1)) / 2)[()]
+
+
+def quadrant_counts(x, y, counted=None):
+    """
+    Counts points in the four quadrants around each point.
+
+    Returns counts of points with coordinates (at most, at most), (at most,
+    greater), (greater, at most) and (greater, greater) than the point's,
+    the point itself included in the first quadrant. If counted is given
+    (a boolean mask over points), only counts points for which it is true.
+    Rows of x and y are treated as separate samples; ties are broken
+    arbitrarily.
+    """
+    batch = asarray(x).ndim > 1
+    x, y = atleast_2d(x), atleast_2d(y)
+    rows, samples = x.shape
+    if counted is None:
+        counted = ones(samples, bool)
+    counted = counted + zeros((rows, 1), bool)
+    order = x.argsort(axis=-1, kind='mergesort')
+    ranks = empty_like(order)
+    put_along_axis(ranks, y.argsort(axis=-1, kind='mergesort'),
+                   arange(samples), -1)
+    ranks = take_along_axis(ranks, order, -1)
+    mask = take_along_axis(counted, order, -1)
+    lower = _lower_left(ranks, mask)
+    # Counted points before in each of the orders.
+    left = cumsum(mask, axis=-1) - mask
+    by_y = take_along_axis(mask, ranks.argsort(axis=-1), -1)
+    below = take_along_axis(cumsum(by_y, axis=-1) - by_y, ranks, -1)
+    total = counted.sum(axis=-1, keepdims=True)
+    quadrants = (lower + mask, left - lower, below - lower,
+                 total - mask - left - below + lower)
+    result = []
+    for quadrant in quadrants:
+        unsorted = empty_like(quadrant)
+        put_along_axis(unsorted, order, quadrant, -1)
+        result.append(unsorted if batch else unsorted[0])
+    return tuple(result)
+
+
+def _lower_left(ranks, mask):
+    """
+    Counts masked points before each point with lesser ranks, for rows.
+
+    Levels of a merge-sort tree are processed one at a time: points in the
+    right halves of blocks count points in the left halves, in one search
+    in the sorted keys of the left halves of all blocks of all rows.
+    """
+    rows, samples = ranks.shape
+    positions = arange(samples)
+    row = arange(rows, dtype=int64)[:, None]
+    counts = zeros((rows, samples), int64)
+    size = 1
+    while size < samples:
+        blocks = -(-samples // (2 * size))
+        block = (row * blocks + positions // (2 * size)) * samples
+        right = positions // size % 2 == 1
+        keys = block + ranks
+        left = sort(keys[:, ~right][mask[:, ~right]])
+        counts[:, right] += (searchsorted(left, keys[:, right]) -
+                             searchsorted(left, block[:, right]))
+        size *= 2
+    return counts
+
+
+def ks2d_null(samples, rounds=1000, random_state=None):
+    """
+    Simulates (or recalls) sorted null statistics for a sample count.
+
+    Samples should be a count for the one-sample test or a pair of counts
+    for the two-sample one. Coordinates are independent and uniform.
+    """
+    key = (samples, rounds)
+    instrument.lookup('ks2d_null', key in null_cache)
+    if key not in null_cache:
+        if isinstance(samples, tuple):
+            n = samples[0]
+
+            def stat(data):
+                return ks2d_2samp_stat(data[..., :n, :], data[..., n:, :])
+            count = sum(samples)
+        else:
+            stat, count = _uniform_stat, samples
+        null_cache[key] = simulator(stat, count, rounds, rounds,
+                                    dimensions=2, vectorized=True,
+                                    random_state=random_state)
+    return null_cache[key]
+
+
+def _uniform_stat(data):
+    return ks2d_stat(data, _uniform_square)
+
+
+class _uniform_square(object):
+    @staticmethod
+    def cdf(points):
+        return points.clip(max=1).prod(axis=-1)
+
+
+def _pvalue(null, statistic):
+    """
+    Estimates the probability of a statistic at least as large.
+    """
+    exceeding = len(null) - searchsorted(null, statistic)
+    return (exceeding + 1) / (len(null) + 1)
@@ -0,0 +1,360 @@
+"""
+Tests of whether two (or more) samples come from the same distribution.
+
+`ks_2samp_test()` is the two-sample counterpart of `ks_test()`: the statistic
+is the greatest difference between the empirical distribution functions of the
+samples, computed by a linear merge of the sorted samples. P-values are exact
+(see `ks_2samp_lattice()`) for pooled sample counts up to exact_limit and
+otherwise approximated with the limiting Kolmogorov distribution (with
+Stephens' correction). For example::
+
+    >>> ks_2samp_test((1, 2, 3), (2.5, 3.5, 4.5, 5.5))
+    GofResult(statistic=0.75, pvalue=0.228...)
+
+Batches of sample pairs may be passed as 2-D arrays, with a pair of samples
+in each pair of rows; statistics and p-values are then arrays.
+
+`ad_ksamp_test()` (the k-sample Anderson-Darling test of Scholz and Stephens)
+and `cvm_2samp_test()` (the two-sample Cramer-von Mises test of Anderson)
+sort the pooled samples once, then compute the statistics from the sample
+labels of the pooled values, in linear time (with a cheap extra sort if there
+are ties). P-values come from asymptotic approximations, or from permutations
+of the labels (see `permutation_test()`), that reuse the pooled order::
+
+    >>> first, second, third = (1, 3, 5, 7), (2, 4, 6, 8), (9, 10, 11, 12)
+    >>> ad_ksamp_test((first, second, third))
+    GofResult(statistic=3.09..., pvalue=0.014...)
+    >>> ad_ksamp_test((first, second, third), permutations=999,
+    ...               random_state=1).pvalue < .05
+    True
+"""
+from __future__ import division
+
+from functools import partial
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from numpy import (absolute, arange, asarray, bincount, concatenate, cumsum,
+                   diff, empty_like, exp, flatnonzero, int64, log, ones,
+                   polyder, polyfit, polyval, repeat, sort, sqrt,
+                   take_along_axis, unique, vectorize, where)
+from numpy.random import RandomState
+from scipy.special import kolmogorov
+
+from .cvmdist import cvm_unif_inf
+from .ecdfgof import GofResult, LazyResult
+from .ksdist import ks_2samp_lattice
+
+# Greatest pooled sample count for exact p-values.
+exact_limit = 2 * 10 ** 4
+
+
+def ks_2samp_stat(first, second):
+    """
+    Calculates the two-sample Kolmogorov-Smirnov statistic for sorted samples.
+
+    Samples may be 2-D arrays, with samples in rows, giving an array of
+    statistics.
+    """
+    first, second = asarray(first), asarray(second)
+    n, m = first.shape[-1], second.shape[-1]
+    pooled = concatenate((first, second), axis=-1)
+    # Merges the two sorted runs (in linear time, with timsort or mergesort).
+    order = pooled.argsort(axis=-1, kind='mergesort')
+    values = take_along_axis(pooled, order, axis=-1)
+    # Differences scaled by n m, so they are exact integers.
+    steps = where(order < n, m, -n)
+    differences = absolute(cumsum(steps, axis=-1))
+    # Only differences after the last of equal values count.
+    last = ones(values.shape, bool)
+    last[..., :-1] = values[..., 1:] != values[..., :-1]
+    return where(last, differences, 0).max(axis=-1) / (n * m)
+
+
+def ks_2samp_sf(statistic, first, second, exact=None):
+    """
+    Calculates the probability of the statistic being at least the given one.
+
+    First and second are the sample counts. Exact p-values are computed for
+    each distinct statistic value if exact is true, or by default if the
+    pooled count is at most exact_limit.
+    """
+    statistic = asarray(statistic, dtype=float)
+    if exact is None:
+        exact = first + second <= exact_limit
+    if exact:
+        values, indices = unique(statistic, return_inverse=True)
+        pvalues = asarray([ks_2samp_lattice(first, second, value)
+                           for value in values])
+        return pvalues[indices].reshape(statistic.shape)[()]
+    root = sqrt(first * second / (first + second))
+    return kolmogorov((root + .12 + .11 / root) * statistic)
+
+
+def ks_2samp_test(first, second, assume_sorted=False, exact=None,
+                  lazy=False):
+    """
+    Tests whether two samples come from the same continuous distribution.
+
+    Samples may be 1-D arrays (or sequences) of any lengths, or 2-D arrays
+    with the same number of rows, for a batch of tests. With lazy, returns
+    a `LazyResult`, computing p-values only for the tests that need them.
+    """
+    first, second = asarray(first), asarray(second)
+    if not assume_sorted:
+        first, second = sort(first, axis=-1), sort(second, axis=-1)
+    statistic = ks_2samp_stat(first, second)
+    sf = partial(ks_2samp_sf, first=first.shape[-1], second=second.shape[-1],
+                 exact=exact)
+    if lazy:
+        return LazyResult(statistic, sf)
+    return GofResult(statistic, sf(statistic))
+
+
+def ad_ksamp_test(samples, permutations=None, workers=None,
+                  random_state=None):
+    """
+    Tests whether a number of samples come from the same distribution.
+
+    Computes the k-sample Anderson-Darling statistic, in the version that
+    accounts for ties (A2akN of Scholz and Stephens), standardized as by
+    `scipy.stats.anderson_ksamp()`. The p-value is interpolated from the
+    critical values of Scholz and Stephens (and extrapolated outside of the
+    .001 -- .25 range), or estimated with the given number of permutations.
+    """
+    pooled = PooledSamples(samples)
+    statistic = pooled.ad()
+    if permutations:
+        pvalue = permutation_test(pooled, 'ad', permutations, workers,
+                                  random_state)
+    else:
+        pvalue = ad_ksamp_sf(statistic, pooled.sizes)
+    return GofResult(statistic, pvalue)
+
+
+def cvm_2samp_test(first, second, permutations=None, workers=None,
+                   random_state=None):
+    """
+    Tests whether two samples come from the same distribution.
+
+    Computes the two-sample Cramer-von Mises statistic (with midranks for
+    ties), as `scipy.stats.cramervonmises_2samp()`. The p-value is found from
+    the limiting distribution, after matching the mean and variance of the
+    statistic for the given sample counts, or with the given number of
+    permutations.
+    """
+    pooled = PooledSamples((first, second))
+    statistic = pooled.cvm()
+    if permutations:
+        pvalue = permutation_test(pooled, 'cvm', permutations, workers,
+                                  random_state)
+    else:
+        pvalue = cvm_2samp_sf(statistic, *pooled.sizes)
+    return GofResult(statistic, pvalue)
+
+
+class PooledSamples(object):
+    """
+    A few samples sorted together, with the sample label of each value.
+
+    Labels may be replaced (for instance permuted) to compute statistics of
+    other divisions of the same pooled values.
+    """
+    def __init__(self, samples):
+        samples = [asarray(sample, dtype=float) for sample in samples]
+        self.sizes = asarray([len(sample) for sample in samples])
+        if (self.sizes == 0).any():
+            raise ValueError("Samples should not be empty.")
+        values = concatenate(samples)
+        # Sorted samples are merged as runs.
+        order = values.argsort(kind='mergesort')
+        self.values = values[order]
+        self.labels = repeat(arange(len(samples)), self.sizes)[order]
+        # Indices of distinct values, starts and sizes of groups of ties.
+        starts = flatnonzero(concatenate(((True,), self.values[1:] !=
+                                          self.values[:-1])))
+        self.ties = len(starts) < len(values)
+        self.starts = starts
+        self.multiplicities = diff(concatenate((starts, (len(values),))))
+        self.groups = repeat(arange(len(starts)), self.multiplicities)
+
+    def ad(self, labels=None):
+        """
+        Calculates the standardized k-sample Anderson-Darling statistic.
+        """
+        return self._standardize(self.ad_raw(labels))
+
+    def ad_raw(self, labels=None):
+        """
+        Calculates the k-sample AD statistic A2akN (before standardization).
+
+        With M_i the counts of values from sample i up to a value (counting
+        ties with the value as halves), B their sum, l the multiplicity of
+        the value and N the total count, the statistic is a sum over distinct
+        values of l (N^2 sum_i M_i^2 / n_i - N B^2) / (B (N - B) - N l / 4),
+        scaled by (N - 1) / N^2. The sums of M_i^2 / n_i are updated from
+        counts of each (value, sample) pair.
+        """
+        if labels is None:
+            labels = self.labels
+        sizes, total = self.sizes, self.sizes.sum()
+        k = len(sizes)
+        if self.ties:
+            keys = self.groups.astype(int64) * k + labels
+            keys.sort(kind='mergesort')
+            starts = flatnonzero(concatenate(((True,), keys[1:] !=
+                                              keys[:-1])))
+            counts = diff(concatenate((starts, (len(keys),))))
+            groups, pairs = keys[starts] // k, keys[starts] % k
+        else:
+            groups, pairs = arange(total), labels
+            counts = ones(total, int64)
+        # Counts of values from the same sample in earlier groups.
+        order = pairs.argsort(kind='mergesort')
+        previous = (cumsum(counts[order]) - counts[order] -
+                    (cumsum(sizes) - sizes)[pairs[order]])
+        earlier = empty_like(previous)
+        earlier[order] = previous
+        weights = 1 / sizes[pairs]
+        half = bincount(groups, (counts * earlier + counts ** 2 / 4) * weights)
+        full = bincount(groups, (2 * counts * earlier + counts ** 2) * weights)
+        squares = concatenate(((0,), cumsum(full)[:-1])) + half
+        multiplicities = self.multiplicities
+        below = cumsum(multiplicities) - multiplicities / 2
+        return ((total - 1) / total ** 2 *
+                (multiplicities * (total ** 2 * squares - total * below ** 2) /
+                 (below * (total - below) - total * multiplicities / 4)).sum())
+
+    def cvm(self, labels=None):
+        """
+        Calculates the two-sample Cramer-von Mises statistic.
+        """
+        if labels is None:
+            labels = self.labels
+        n, m = self.sizes
+        total = n + m
+        # Midranks of the pooled values.
+        ranks = repeat(self.starts + (self.multiplicities + 1) / 2,
+                       self.multiplicities)
+        first, second = ranks[labels == 0], ranks[labels == 1]
+        u = (n * ((first - arange(1, n + 1)) ** 2).sum() +
+             m * ((second - arange(1, m + 1)) ** 2).sum())
+        return u / (n * m * total) - (4 * n * m - 1) / (6 * total)
+
+    def ks(self, labels=None):
+        """
+        Calculates the two-sample Kolmogorov-Smirnov statistic.
+        """
+        if labels is None:
+            labels = self.labels
+        n, m = self.sizes
+        differences = absolute(cumsum(where(labels == 0, m, -n)))
+        ends = concatenate((self.starts[1:], (n + m,))) - 1
+        return differences[ends].max() / (n * m)
+
+    def _standardize(self, statistic):
+        """
+        Standardizes A2akN using its variance (Scholz and Stephens eq. 4).
+        """
+        sizes, total = self.sizes, self.sizes.sum()
+        k = len(sizes)
+        H = (1 / sizes).sum()
+        hs = cumsum(1 / arange(total - 1, 1, -1))
+        h = hs[-1] + 1
+        g = (hs / arange(2, total)).sum()
+        a = (4 * g - 6) * (k - 1) + (10 - 6 * g) * H
+        b = ((2 * g - 4) * k ** 2 + 8 * h * k + (2 * g - 14 * h - 4) * H -
+             8 * h + 4 * g - 6)
+        c = ((6 * h + 2 * g - 2) * k ** 2 + (4 * h - 4 * g + 6) * k +
+             (2 * h - 6) * H + 4 * h)
+        d = (2 * h + 6) * k ** 2 - 4 * h * k
+        variance = ((a * total ** 3 + b * total ** 2 + c * total + d) /
+                    ((total - 1) * (total - 2) * (total - 3)))
+        return (statistic - (k - 1)) / sqrt(variance)
+
+
+# Interpolation coefficients and levels from table 2 of Scholz and Stephens.
+ad_ksamp_b = ((.675, 1.281, 1.645, 1.96, 2.326, 2.573, 3.085),
+              (-.245, .25, .678, 1.149, 1.822, 2.364, 3.615),
+              (-.105, -.305, -.362, -.391, -.396, -.345, -.154))
+ad_ksamp_levels = (.25, .1, .05, .025, .01, .005, .001)
+
+
+def ad_ksamp_sf(statistic, sizes):
+    """
+    Approximates p-values of the standardized k-sample AD statistic.
+
+    Critical values for the number of samples are interpolated from the
+    Scholz and Stephens table, and a quadratic is fitted to the logarithms of
+    the significance levels. The quadratic may turn back outside of the
+    table, so it is continued linearly (in the logarithm of the p-value)
+    past the first and last critical values, with the p-value limited to one.
+    """
+    m = len(sizes) - 1
+    b0, b1, b2 = (asarray(b) for b in ad_ksamp_b)
+    critical = b0 + b1 / sqrt(m) + b2 / m
+    fit = polyfit(critical, log(ad_ksamp_levels), 2)
+    statistic = asarray(statistic, dtype=float)
+    inner = statistic.clip(critical[0], critical[-1])
+    logs = (polyval(fit, inner) +
+            polyval(polyder(fit), inner) * (statistic - inner))
+    return exp(logs).clip(max=1)[()]
+
+
+def cvm_2samp_sf(statistic, first, second):
+    """
+    Approximates p-values of the two-sample Cramer-von Mises statistic.
+
+    The statistic is shifted and scaled to match the mean and variance of the
+    limiting distribution (after Anderson, 1962), as in SciPy.
+    """
+    total, product = first + second, first * second
+    mean = (1 + 1 / total) / 6
+    variance = ((total + 1) * (4 * product * total - 3 *
+                               (first ** 2 + second ** 2) - 2 * product) /
+                (45 * total ** 2 * 4 * product))
+    standard = 1 / 6 + (asarray(statistic) - mean) / sqrt(45 * variance)
+    return (1 - _cvm_unif_inf(standard)).clip(0, 1)[()]
+
+
+_cvm_unif_inf = vectorize(cvm_unif_inf, otypes=(float,))
+
+# Number of permutations evaluated in a single task.
+permutations_batch = 64
+
+
+def permutation_test(pooled, stat, permutations=9999, workers=None,
+                     random_state=None):
+    """
+    Estimates a p-value by randomly permuting sample labels.
+
+    Pooled should be `PooledSamples` (or a sequence of samples) and stat the
+    name of one of its statistics ('ad', 'cvm' or 'ks'). The pooled order and
+    groups of ties are computed once; permutations are evaluated in batches
+    in workers threads (all processors by default), each batch with its own
+    random seed drawn from random_state. Returns the fraction of permutations
+    (counting the original labels) giving a statistic at least as large.
+    """
+    if not isinstance(pooled, PooledSamples):
+        pooled = PooledSamples(pooled)
+    statistic = getattr(pooled, stat)
+    observed = statistic()
+    if not isinstance(random_state, RandomState):
+        random_state = RandomState(random_state)
+    batches = [min(permutations_batch, permutations - start)
+               for start in range(0, permutations, permutations_batch)]
+    seeds = random_state.randint(2 ** 31, size=len(batches))
+
+    def count(batch):
+        size, seed = batch
+        state = RandomState(seed)
+        # Tolerates rounding of statistics equal to the observed one.
+        return sum(statistic(state.permutation(pooled.labels)) >=
+                   observed - 1e-12 * abs(observed) for _ in range(size))
+
+    pool = ThreadPool(workers or cpu_count())
+    try:
+        exceeding = sum(pool.map(count, zip(batches, seeds)))
+    finally:
+        pool.close()
+    return (exceeding + 1) / (permutations + 1)
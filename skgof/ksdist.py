@@ -7,12 +7,17 @@ from __future__ import division
 
 from fractions import Fraction
 from math import factorial, floor
+from timeit import default_timer
 
-from numpy import (arange, dot, exp, fmax, fromfunction, identity, log, modf,
-                   pi, sqrt, tri)
-from scipy.special import gamma, gammaln, smirnov
+from numpy import (absolute, arange, array, asarray, concatenate, cumsum, dot,
+                   errstate, exp, fmax, fromfunction, identity, interp, log,
+                   modf, ones, pi, searchsorted, sqrt, tri, unique, zeros)
+from numpy.fft import irfft, rfft
+from scipy.fftpack import next_fast_len
+from scipy.special import gamma, gammaln, kolmogorov, smirnov, xlogy
 from scipy.stats import rv_continuous
 
+from . import instrument
 from .vect import varange, vectorize
 
 
@@ -20,7 +25,26 @@ class ks_unif_gen(rv_continuous):
     """
     Approximate Kolmogorov-Smirnov two-sided, one-sample, distribution-free
     statistic (the hypothesized distribution continuous and fully specified).
+
+    The method of calculation is chosen for each value by `ks_unif_method()`,
+    for the given target relative accuracy of the distribution function
+    (rtol) and time budget per evaluation (in seconds); for instance
+    ``ks_unif_gen(budget=1e-3)`` gives a faster variant of `ks_unif`. Costs
+    of the methods default to `default_costs`; measured ones may be given
+    as ``ks_unif_gen(costs=calibrate())``.
     """
+    def __init__(self, rtol=None, budget=None, costs=None, **kwargs):
+        kwargs.setdefault('a', 0)
+        kwargs.setdefault('shapes', 'samples')
+        if rtol is None and budget is None and costs is None:
+            kwargs.setdefault('name', 'ks-unif')
+        else:
+            kwargs.setdefault('name', 'ks-unif({}, {})'.format(rtol, budget))
+        super(ks_unif_gen, self).__init__(**kwargs)
+        self.rtol, self.budget, self.costs = rtol, budget, costs
+        # Passed on to frozen distributions (as other constructor arguments).
+        self._ctor_param.update(rtol=rtol, budget=budget, costs=costs)
+
     def _argcheck(self, samples):
         return samples > 0
 
@@ -36,25 +60,13 @@ class ks_unif_gen(rv_continuous):
             return exp(gammaln(samples + 1) + samples * log(t))
         if statistic >= 1 - 1 / samples:
             return 1 - 2 * (1 - statistic) ** samples
-
-        # For small sample counts we may use an exact method when needed.
-        if samples < 150:
-            # With samples = 150 the matrix calculation takes about 100 ms
-            # on a ~3 GFLOPS/core processor.
-            if samples * statistic ** 2 < 7:
-                # For a small threshold the Durbin matrix will be small.
-                return ks_unif_durbin_matrix(samples, statistic)
-            else:
-                # Double the one-sided probability; accurate when close to one.
-                return 1 - 2 * smirnov(samples, statistic)
-
-        # Further we need to make a compromise between speed and accuracy.
-        if samples < 100000 and samples * statistic ** 1.5 < 1.4:
-            # The cost of the matrix calculation should still be acceptable.
-            return ks_unif_durbin_matrix(samples, statistic)
-        else:
-            # No options left, but to use an asymptotic approximation.
-            return ks_unif_pelz_good(samples, statistic)
+        method = ks_unif_method(samples, statistic, self.rtol, self.budget,
+                                self.costs)
+        instrument.count('ks_unif.method', method)
+        if method == 'durbin':
+            instrument.observe('ks_unif.order',
+                               2 * int(samples * statistic) + 1)
+        return methods[method](samples, statistic)
 
     @vectorize(otypes=(float,))
     def _sf(self, statistic, samples):
@@ -75,7 +87,121 @@ class ks_unif_gen(rv_continuous):
             return min(1., 2 * smirnov(samples, statistic))
 
 
-ks_unif = ks_unif_gen(a=0, name='ks-unif', shapes='samples')
+ks_unif = ks_unif_gen()
+
+
+# Default relative accuracy and time budget (in seconds) of evaluations.
+default_rtol = 1e-12
+default_budget = .01
+
+# Time limit for methods chosen only by accuracy.
+longest = 10.
+
+# Costs of methods (in seconds) on a ~3 GFLOPS/core processor: per call, per
+# multiply-add of matrix products, and per sample for the loop of the Durbin
+# matrix method and for smirnov(). Use `calibrate()` to measure them (and
+# pass them to `ks_unif_gen`, so that `ks_unif` results stay the same).
+default_costs = {'call': 2e-5, 'matmul': 3e-10, 'loop': 2e-7,
+                 'smirnov': 1e-6}
+
+# Relative errors of the Pelz-Good and limit distribution functions, for 150
+# samples, at a few values of samples * statistic ** 2 (interpolated between
+# these, and one or machine precision outside, respectively). Errors
+# decrease about as samples ** -1.75 and samples ** -.5 respectively.
+error_points = (.02, .05, .1, .2, .3, .6, 1, 2, 4, 7, 12, 18, 40)
+pelz_good_errors = (1, 6e-2, 3e-3, 3e-5, 3e-5, 3e-6, 1e-6, 5e-7, 4e-8, 6e-9,
+                    3e-12, 1e-15, 1e-15)
+limit_errors = (1, .8, .5, .2, 8e-2, 2e-2, 4e-3, 5e-5, 1e-5, 3e-8, 4e-12,
+                4e-16, 4e-16)
+
+
+def ks_unif_method(samples, statistic, rtol=None, budget=None, costs=None):
+    """
+    Chooses a method to calculate the distribution function with.
+
+    Among the methods estimated to take at most budget seconds, picks the
+    quickest one estimated to be accurate to rtol, or the most accurate one
+    if none is. Without either, default_rtol and default_budget are used;
+    with just rtol, methods of up to longest seconds are considered. If no
+    method fits the budget, the quickest one is taken. Costs default to the
+    default ones.
+    """
+    estimates = ks_unif_estimates(samples, statistic, costs)
+    if rtol is None and budget is None:
+        rtol, budget = default_rtol, default_budget
+    elif budget is None:
+        budget = longest
+    affordable = [method for method, (error, time) in estimates.items()
+                  if time <= budget]
+    if not affordable:
+        return min(estimates, key=lambda method: estimates[method][1])
+    if rtol is not None:
+        accurate = [method for method in affordable
+                    if estimates[method][0] <= rtol]
+        if accurate:
+            return min(accurate, key=lambda method: estimates[method][1])
+    return min(affordable, key=lambda method: estimates[method])
+
+
+def ks_unif_estimates(samples, statistic, costs=None):
+    """
+    Estimates relative errors and times of the distribution function methods.
+
+    Returns a dictionary of (error, time) pairs keyed by method names.
+    """
+    if costs is None:
+        costs = default_costs
+    samples = int(samples)
+    squared = samples * statistic ** 2
+    rounding = 1e-15 * sqrt(samples)
+    call = costs['call']
+    # The Durbin matrix is raised to the power of samples by squaring.
+    order = 2 * int(samples * statistic) + 1
+    products = samples.bit_length() + bin(samples).count('1') - 1
+    durbin = call + (costs['matmul'] * order ** 3 * products +
+                     costs['loop'] * samples)
+    # Doubling neglects the probability of crossing both sides.
+    with errstate(divide='ignore'):
+        doubled = 2 * exp(-8 * squared) / (1 - kolmogorov(sqrt(squared)))
+    points = log(error_points)
+    scale = samples / 150
+    pelz_good = exp(interp(log(squared), points, log(pelz_good_errors),
+                           right=0)) * scale ** -1.75
+    limit = exp(interp(log(squared), points, log(limit_errors),
+                       right=log(1e-16))) * scale ** -.5
+    return {'durbin': (10 * rounding, durbin),
+            'doubled': (doubled + rounding, call + costs['smirnov'] * samples),
+            'pelz-good': (pelz_good + rounding, call),
+            'limit': (limit + rounding, call)}
+
+
+def calibrate(repeat=5):
+    """
+    Measures method costs on this machine.
+
+    Takes about a second. Returns the costs, to be passed to `ks_unif_gen`
+    (`default_costs`, used by `ks_unif`, are not changed); they may be saved
+    (for example as JSON) and reused in later sessions.
+    """
+    def best(function, *args):
+        times = []
+        for _ in range(repeat):
+            start = default_timer()
+            function(*args)
+            times.append(default_timer() - start)
+        return min(times)
+
+    matrix = ones((128, 128)) / 128
+    loop = 10 ** 4
+
+    def durbin_loop():
+        x = 1.
+        for i in arange(1, loop + 1):
+            x *= i / loop
+    return {'call': best(ks_unif_pelz_good, 1000, .03),
+            'matmul': best(dot, matrix, matrix) / 128 ** 3,
+            'loop': best(durbin_loop) / loop,
+            'smirnov': best(smirnov, 10 ** 5, .01) / 10 ** 5}
 
 
 # Some arbitrary constants used for externalizing float exponents.
@@ -159,6 +285,164 @@ def ks_unif_durbin_recurrence_rational(samples, statistic):
     return qs[samples] * factorial(samples) / samples ** samples
 
 
+def ks_2samp_lattice(first, second, statistic):
+    """
+    Calculates the probability that the two-sample statistic is at least the
+    given value, by counting lattice paths crossing the boundary.
+
+    A path from (0, 0) to (first, second) corresponds to an ordering of the
+    pooled samples; the statistic is at least d if the path reaches a point
+    with |i / first - j / second| >= d. Counts of paths staying within the
+    boundary are computed a row at a time (a row is a cumulative sum of the
+    previous one, limited to the band), with exponents externalized as for
+    the Durbin matrix. Probabilities of first reaching the boundary at each
+    point are added up directly, so small p-values do not suffer from
+    cancellation.
+    """
+    n, m = sorted((first, second))
+    height = int(round(statistic * n * m))
+    if height <= 0:
+        return 1.
+    if height > n * m:
+        return 0.
+    with errstate(divide='ignore'):
+        # Some of the counts may be zero.
+        return _ks_2samp_lattice(n, m, height)
+
+
+def _ks_2samp_lattice(n, m, height):
+    """
+    Sums probabilities of leaving the band |i m - j n| < height, n <= m.
+    """
+    # Logarithms of the numbers of ways to finish from (i, j), over the
+    # number of all paths.
+    lbinom = gammaln(n + m + 1) - gammaln(n + 1) - gammaln(m + 1)
+
+    def completions(i, j):
+        return (gammaln(n + m - i - j + 1) - gammaln(n - i + 1) -
+                gammaln(m - j + 1) - lbinom)
+
+    # Counts of paths within the band, row i covering j = low, ..., high,
+    # and logarithms of probabilities of paths leaving it at given points.
+    low, high = 0, min(m, -(-height // n) - 1)
+    counts = ones(high + 1)
+    exponent = 0
+    logs = []
+    if high < m:
+        logs.append(completions(0, high + 1))
+    for i in range(1, n + 1):
+        new_low = max(0, (i * m - height) // n + 1)
+        new_high = min(m, -(-(i * m + height) // n) - 1)
+        if new_low > low:
+            # Steps down from the previous row leave the band.
+            j = arange(low, min(new_low, high + 1))
+            logs.extend(log(counts[:len(j)]) + exponent * log(2) +
+                        completions(i, j))
+        steps = zeros(new_high - new_low + 1)
+        kept = counts[new_low - low:]
+        steps[:len(kept)] = kept[:len(steps)]
+        counts = cumsum(steps)
+        low, high = new_low, new_high
+        if len(counts) == 0:
+            break
+        if new_high < m:
+            logs.append(log(counts[-1]) + exponent * log(2) +
+                        completions(i, new_high + 1))
+        if counts[-1] > factor:
+            counts *= factorr
+            exponent += shift
+    return min(1., exp(array(logs)).sum())
+
+
+# Convolutions with longer kernels use the FFT.
+fft_threshold = 32
+
+
+def ks_discrete_sf(statistics, samples, lows, highs):
+    """
+    Calculates the probability that the statistic is at least the given
+    values, for a distribution function with jumps from lows to highs.
+
+    The distribution function is assumed to be continuous between the
+    jumps (lows and highs being increasing and interleaved). The statistic
+    depends only on the values taken by the uniform empirical function
+    over the range of the distribution function, so the probability that it
+    stays within the band is a probability of a Poisson process (with
+    n events expected over [0, 1]) staying within the band at a few points,
+    conditioned on n events in total. Counts are propagated from point to
+    point by convolutions with Poisson probabilities, limited to the counts
+    within the band, and vectorized over the statistics. The points are the
+    jumps' ends and, on continuous stretches, the points at which the band
+    crosses integer counts.
+    """
+    statistics = asarray(statistics, dtype=float)
+    bands = (samples * (1 - 1e-10)) * statistics.reshape(-1, 1)
+    low, state = 0, ones((len(bands), 1))
+    crossing = zeros(len(bands))
+    previous = 0.
+    for point in _ks_discrete_points(statistics.ravel(), samples, lows,
+                                     highs):
+        if point > previous:
+            state = _poisson_step(state, low, samples * (point - previous),
+                                  samples)
+            previous = point
+        # Counts of at most centre - band or at least centre + band cross;
+        # the probabilities of first crossing here are added up directly.
+        counts = arange(low, low + state.shape[1])
+        outside = absolute(counts - samples * point) >= bands
+        finishing = _poisson_pmf(samples - counts, samples * (1 - point))
+        crossing += dot(state * outside, finishing)
+        state[outside] = 0
+        kept = (~outside.all(axis=0)).nonzero()[0]
+        if len(kept) == 0:
+            break
+        state = state[:, kept[0]:kept[-1] + 1]
+        low += kept[0]
+    crossing /= _poisson_pmf(samples, samples)
+    return crossing.clip(max=1).reshape(statistics.shape)[()]
+
+
+def _ks_discrete_points(statistics, samples, lows, highs):
+    """
+    Lists points of the distribution function range to check the band at.
+    """
+    lows, highs = asarray(lows, dtype=float), asarray(highs, dtype=float)
+    # Continuous stretches, between the jumps.
+    starts = concatenate(((0,), highs))
+    ends = concatenate((lows, (1,)))
+    edges = concatenate((starts, ends)).reshape(2, -1)[:, ends > starts]
+    steps = arange(samples + 1) / samples
+    crossings = concatenate([steps - statistic for statistic in statistics] +
+                            [steps + statistic for statistic in statistics])
+    inside = searchsorted(edges.T.ravel(), crossings, 'right') % 2 == 1
+    return unique(concatenate((lows, highs, crossings[inside])))
+
+
+def _poisson_pmf(counts, mean):
+    return exp(xlogy(counts, mean) - mean - gammaln(counts + 1))
+
+
+def _poisson_step(state, low, mean, samples):
+    """
+    Adds a Poisson count to counts from low (limiting the sum to samples).
+    """
+    # Probabilities less than 1e-30 of the greatest one are neglected.
+    reach = min(samples - low, int(mean + 12 * sqrt(mean) + 30))
+    kernel = _poisson_pmf(arange(reach + 1), mean)
+    kernel = kernel[:(kernel >= 1e-30 * kernel.max()).nonzero()[0][-1] + 1]
+    rows, width = state.shape
+    size = min(width + len(kernel) - 1, samples - low + 1)
+    if len(kernel) <= fft_threshold:
+        result = zeros((rows, size))
+        for count, probability in enumerate(kernel):
+            stop = min(width, size - count)
+            result[:, count:count + stop] += probability * state[:, :stop]
+        return result
+    length = next_fast_len(width + len(kernel) - 1)
+    result = irfft(rfft(state, length) * rfft(kernel, length), length)
+    return fmax(result[:, :size], 0)
+
+
 # Constants from the Pelz-Good approximation.
 hs2 = varange(.5, 21) ** 2
 ehs2 = exp(-hs2)
@@ -200,3 +484,25 @@ def ks_unif_pelz_good(samples, statistic):
     w = -pi2 / 2 * r2x2
     return hpi1d2 * ((a1 + (a2 + (a3 + a4 * hs2) * hs2) * hs2) * exp(w * hs2) +
                      (a5 + a6 * is2) * is2 * exp(w * is2)).sum()
+
+
+def ks_unif_doubled(samples, statistic):
+    """
+    Doubles the one-sided probability; accurate when the result is close to
+    one (that is for large samples * statistic ** 2).
+    """
+    return 1 - 2 * smirnov(samples, statistic)
+
+
+def ks_unif_limit(samples, statistic):
+    """
+    Approximates the distribution function by the Kolmogorov limit, with
+    Stephens' correction for the sample count.
+    """
+    root = sqrt(samples)
+    return 1 - kolmogorov((root + .12 + .11 / root) * statistic)
+
+
+# Distribution function methods by ks_unif_method() names.
+methods = {'durbin': ks_unif_durbin_matrix, 'doubled': ks_unif_doubled,
+           'pelz-good': ks_unif_pelz_good, 'limit': ks_unif_limit}
@@ -0,0 +1,260 @@
+"""
+Minimum-distance estimation of distribution parameters.
+
+Parameters of a SciPy family are chosen to minimize one of the EDF statistics
+of the sample. The sample is sorted once and the index grids and working
+arrays are shared by all evaluations of the objective. For the Cramer-von Mises
+and Anderson-Darling statistics gradients are computed analytically: with u_i
+the sorted distribution function values
+
+    dW^2 / du_i = 2 (u_i - (2i + 1) / 2n),
+    dA^2 / du_i = ((2n - 2i - 1) / (1 - u_i) - (2i + 1) / u_i) / n,
+
+chained through the pdf for the location and scale (du / dloc = -f(x),
+du / dscale = -f(x) (x - loc) / scale), and through a one-sided difference of
+the cdf for shape parameters; the optimization then needs a few dozen passes
+over the data. The Kolmogorov-Smirnov statistic is minimized without
+derivatives.
+
+Example::
+
+    >>> from scipy.stats import gamma
+    >>> data = gamma(2, 1, 3).rvs(size=10000, random_state=1)
+    >>> fit = min_distance_fit(data, gamma, stat=cvm_stat)
+    >>> [round(param, 1) for param in fit.params]  # Shape, location, scale.
+    [2.0, 1.0, 3.0]
+
+Grid initialization evaluates the statistic for a whole grid of parameters
+(in broadcast calls) and starts from the best point::
+
+    >>> from numpy import linspace
+    >>> shapes, scales = linspace(1, 4, 7)[:, None], linspace(1, 5, 9)
+    >>> fit = min_distance_fit(data, gamma, grid=(shapes, 1, scales))
+    >>> [round(param, 1) for param in fit.params]
+    [2.0, 1.0, 3.0]
+"""
+from __future__ import division
+
+from collections import namedtuple
+
+from numpy import (asarray, broadcast_arrays, dot, empty, exp, inf, isfinite,
+                   log, multiply, sort, subtract)
+from scipy._lib.six import string_types
+from scipy.optimize import minimize
+from scipy.stats import distributions
+
+from .ecdfgof import _grid, cvm_stat, edf_field, edf_stats
+from .screen import chunk_size
+
+# Objective value for invalid parameters or an infinite statistic.
+penalty = 1e10
+
+MinDistanceResult = namedtuple('MinDistanceResult', ('params', 'statistic',
+                                                     'dist'))
+
+
+class MinDistance(object):
+    """
+    The distance of a sorted sample to a family, as a function of parameters.
+
+    Parameters are given as for the family (shapes, location, scale), with
+    the scale replaced by its logarithm; `objective()` returns the statistic
+    and its gradient, `statistic()` just the value.
+    """
+    def __init__(self, data, family, stat=cvm_stat, assume_sorted=False):
+        if isinstance(family, string_types):
+            family = getattr(distributions, family)
+        self.family = family
+        self.field = edf_field(stat)
+        if self.field not in ('ks', 'cvm', 'ad'):
+            raise ValueError("Only the KS, CvM and AD statistics are "
+                             "supported.")
+        data = asarray(data, dtype=float)
+        self.data = data if assume_sorted else sort(data)
+        samples = len(self.data)
+        self.minuends = _grid('minuends', samples, self.data.dtype)
+        self.factors = _grid('factors', samples, self.data.dtype)
+        self.standard = empty(samples)
+        self.work = empty(samples)
+        self.gradient = empty(samples)
+        self.evaluations = 0
+
+    @property
+    def shapes(self):
+        return self.family.numargs
+
+    def params(self, point):
+        """
+        Converts an optimization point to family parameters.
+        """
+        point = tuple(point)
+        return point[:-1] + (exp(point[-1]),)
+
+    def statistic(self, point):
+        """
+        Calculates the statistic for the given (log-scale) parameters.
+        """
+        uniform = self._uniform(point)
+        if uniform is None:
+            return inf
+        return getattr(edf_stats(uniform, self.work), self.field)
+
+    def objective(self, point):
+        """
+        Calculates the CvM or AD statistic and its gradient.
+        """
+        uniform = self._uniform(point)
+        if uniform is None or self.field == 'ad' and (
+                uniform[0] <= 0 or uniform[-1] >= 1):
+            # Line searches back off from a large value more reliably than
+            # from an infinite one.
+            return penalty, 0 * asarray(point, dtype=float)
+        samples = len(uniform)
+        work, gradient = self.work, self.gradient
+        if self.field == 'cvm':
+            subtract(uniform, self.minuends, out=gradient)
+            value = (1 / (12 * samples) + dot(gradient, gradient))
+            gradient *= 2
+        else:
+            subtract(1, uniform, out=work)
+            value = -samples - (dot(self.factors, log(uniform)) +
+                                dot(self.factors[::-1], log(work))) / samples
+            multiply(self.factors[::-1], 1 / work, out=work)
+            subtract(work, self.factors / uniform, out=gradient)
+            gradient /= samples
+        shapes, loc, scale = self._split(point)
+        derivatives = []
+        for index, shape in enumerate(shapes):
+            step = 1e-7 * max(1, abs(shape))
+            shifted = list(shapes)
+            shifted[index] += step
+            difference = self.family.cdf(self.standard, *shifted) - uniform
+            derivatives.append(dot(gradient, difference) / step)
+        # Derivatives of u with respect to loc and log(scale), over the pdf,
+        # are -1 / scale and -standard.
+        density = self.family.pdf(self.standard, *shapes)
+        multiply(gradient, density, out=work)
+        derivatives.append(-work.sum() / scale)
+        derivatives.append(-dot(work, self.standard))
+        return value, asarray(derivatives)
+
+    def fit(self, start, **options):
+        """
+        Minimizes the statistic starting from the given family parameters.
+
+        Options are passed to `scipy.optimize.minimize()`.
+        """
+        start = asarray(start, dtype=float)
+        start[-1] = log(start[-1])
+        if self.field == 'ks':
+            options.setdefault('method', 'Nelder-Mead')
+            result = minimize(self.statistic, start, **options)
+        else:
+            options.setdefault('method', 'L-BFGS-B')
+            result = minimize(self.objective, start, jac=True, **options)
+        params = self.params(result.x)
+        return MinDistanceResult(params, self.statistic(result.x),
+                                 self.family(*params))
+
+    def search(self, grid):
+        """
+        Finds the parameters with the least statistic on a grid.
+
+        The grid should be a sequence of family parameters (shapes, location,
+        scale) as arrays broadcasting together; statistics are computed for
+        a number of parameter sets at once.
+        """
+        grid = [a.ravel() for a in broadcast_arrays(*grid)]
+        count = len(grid[0])
+        statistics = empty(count)
+        rows = max(1, chunk_size // len(self.data))
+        for start in range(0, count, rows):
+            batch = [a[start:start + rows, None] for a in grid]
+            uniform = self.family.cdf(self.data, *batch)
+            statistics[start:start + rows] = \
+                getattr(edf_stats(uniform), self.field)
+        statistics[~isfinite(statistics)] = inf
+        best = statistics.argmin()
+        return tuple(a[best] for a in grid)
+
+    def guess(self):
+        """
+        Matches the median and quartiles with shapes set to one.
+
+        The location and scale are adjusted if needed, so that the support
+        includes all of the data (otherwise the AD statistic is infinite).
+        """
+        shapes = (1.,) * self.shapes
+        if not self.family._argcheck(*shapes):
+            raise ValueError("Please give start parameters or a grid.")
+        low, middle, high = self.family.ppf((.25, .5, .75), *shapes)
+        samples = len(self.data)
+        quartiles = self.data[[samples // 4, samples // 2,
+                               3 * samples // 4]]
+        scale = (quartiles[2] - quartiles[0]) / (high - low)
+        return self.cover(shapes + (quartiles[1] - scale * middle, scale))
+
+    def cover(self, params):
+        """
+        Adjusts the location and scale for the support to include the data.
+        """
+        shapes, loc, scale = params[:-2], params[-2], params[-1]
+        try:
+            a, b = self.family._get_support(*shapes)
+        except AttributeError:
+            # Older SciPy versions only have shape-independent bounds.
+            a, b = self.family.a, self.family.b
+        data = self.data
+        margin = (data[-1] - data[0]) / len(data)
+        if isfinite(a) and isfinite(b):
+            scale = max(scale, (data[-1] - data[0] + 2 * margin) / (b - a))
+        if isfinite(a):
+            loc = min(loc, data[0] - margin - a * scale)
+        if isfinite(b):
+            loc = max(loc, data[-1] + margin - b * scale)
+        return tuple(shapes) + (loc, scale)
+
+    def _split(self, point):
+        point = tuple(point)
+        return point[:-2], point[-2], exp(point[-1])
+
+    def _uniform(self, point):
+        """
+        Evaluates the cdf with the given parameters, None if they are invalid.
+        """
+        self.evaluations += 1
+        shapes, loc, scale = self._split(point)
+        if not (self.family._argcheck(*shapes) and scale > 0):
+            return None
+        subtract(self.data, loc, out=self.standard)
+        self.standard /= scale
+        uniform = self.family.cdf(self.standard, *shapes)
+        if not isfinite(uniform).all():
+            return None
+        return uniform
+
+
+def min_distance_fit(data, family, stat=cvm_stat, start=None, grid=None,
+                     assume_sorted=False, **options):
+    """
+    Estimates parameters of a SciPy family minimizing a distance to data.
+
+    The distance is one of the `ks_stat()`, `cvm_stat()` or `ad_stat()`
+    statistics (or their names). The search starts from the given parameters
+    (shapes, location, scale), the best point of a grid (see
+    `MinDistance.search()`) or, by default, from a quartile match with shape
+    parameters of one. As the AD statistic is infinite if the data is not
+    within the support, without given start parameters it is minimized
+    starting from a CvM estimate.
+
+    Returns the estimated parameters, the statistic value and the frozen
+    distribution.
+    """
+    distance = MinDistance(data, family, stat, assume_sorted)
+    if start is None:
+        start = distance.search(grid) if grid is not None else \
+            distance.guess()
+        if distance.field == 'ad':
+            initial = MinDistance(distance.data, family, cvm_stat, True)
+            start = distance.cover(initial.fit(start).params)
+    return distance.fit(start, **options)
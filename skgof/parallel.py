@@ -0,0 +1,110 @@
+"""
+Multi-threaded sorting and distribution function evaluation.
+
+NumPy sorts and SciPy distribution functions (built on ufuncs) release the
+global interpreter lock while working on arrays, so processing parts of an
+array in a pool of threads lets them run on several processors at once.
+The results do not depend on the number of threads used.
+
+Example::
+
+    from scipy.stats import norm
+    from skgof.parallel import parallel_cdf, parallel_sort
+
+    data = parallel_sort(data, workers=16)
+    uniform = parallel_cdf(norm(0, 1), data, workers=16)
+"""
+from __future__ import division
+
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from numpy import (arange, array, asarray, concatenate, cumsum, empty,
+                   linspace, searchsorted, sort)
+
+# Arrays shorter than this are sorted in the calling thread.
+parallel_threshold = 2 ** 16
+
+# Number of elements passed to the distribution function at once.
+chunk_size = 2 ** 16
+
+
+def parallel_sort(data, workers=None, overwrite_input=False):
+    """
+    Sorts a one-dimensional array using a number of threads.
+
+    The data is split into parts that are sorted concurrently, then each
+    part is divided by a common set of splitters (chosen through a regular
+    sampling of the sorted parts) and the pieces falling between consecutive
+    splitters are merged, also concurrently, into the result.
+
+    Workers gives the number of threads (all processors by default). With
+    overwrite_input the data array is used as scratch space (and its contents
+    are lost), otherwise it is copied. Returns a new array in either case,
+    unless the data is too small to be worth splitting.
+    """
+    data = asarray(data)
+    workers = min(workers or cpu_count(), len(data))
+    if workers <= 1 or len(data) < parallel_threshold:
+        if overwrite_input:
+            data.sort()
+            return data
+        return sort(data)
+    scratch = data if overwrite_input else array(data)
+    bounds = linspace(0, len(data), workers + 1).astype(int)
+    parts = [scratch[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    pool = ThreadPool(workers)
+    try:
+        pool.map(lambda part: part.sort(), parts)
+        # Each sorted part contributes evenly spaced samples and the sorted
+        # samples give the splitters.
+        indices = linspace(0, 1, workers + 1)[:-1]
+        samples = sort(concatenate([p[(indices * len(p)).astype(int)]
+                                    for p in parts]))
+        splitters = samples[arange(1, workers) * workers]
+        positions = array([concatenate(((0,), searchsorted(p, splitters),
+                                        (len(p),))) for p in parts])
+        sizes = (positions[:, 1:] - positions[:, :-1]).sum(axis=0)
+        offsets = concatenate(((0,), cumsum(sizes)))
+        out = empty(len(data), data.dtype)
+
+        def merge(piece):
+            segment = out[offsets[piece]:offsets[piece + 1]]
+            start = 0
+            for part, position in zip(parts, positions):
+                values = part[position[piece]:position[piece + 1]]
+                segment[start:start + len(values)] = values
+                start += len(values)
+            # Merges the sorted runs (timsort for most types).
+            segment.sort(kind='mergesort')
+
+        pool.map(merge, range(workers))
+    finally:
+        pool.close()
+    return out
+
+
+def parallel_cdf(dist, data, workers=None, out=None):
+    """
+    Evaluates the distribution function on data, using a number of threads.
+
+    The out array, if given, may be the data array itself.
+    """
+    if out is None:
+        out = empty(len(data))
+    starts = range(0, len(data), chunk_size)
+
+    def evaluate(start):
+        stop = start + chunk_size
+        out[start:stop] = dist.cdf(data[start:stop])
+
+    if workers == 1 or len(starts) <= 1:
+        for start in starts:
+            evaluate(start)
+    else:
+        pool = ThreadPool(workers or cpu_count())
+        try:
+            pool.map(evaluate, starts)
+        finally:
+            pool.close()
+    return out
@@ -0,0 +1,122 @@
+"""
+Power of the simple tests against given alternatives.
+
+Samples are drawn from an alternative distribution in batches (rows of a
+2-D array), sorted and passed through the hypothesized distribution function
+together, and the statistics of all rows are computed at once (by
+`edf_stats()`, so the KS, CvM and AD statistics come from the same pass).
+Statistics are compared with critical values of their null distributions,
+calculated once per sample count and significance level. Sample counts are
+simulated in parallel threads::
+
+    >>> from scipy.stats import norm
+    >>> curves = power_curves(norm(0, 1), norm(.2, 1), (50, 200, 800),
+    ...                       rounds=2000, random_state=1)
+    >>> curves['ad'].power.round(1)
+    array([[0.3, 0.8, 1. ]])
+    >>> bool((curves['ks'].power <= curves['ad'].power).all())
+    True
+
+Results have an array per test, with a row for each alternative and a
+column for each sample count, together with confidence intervals (Wilson's)
+for the estimates.
+"""
+from __future__ import division
+
+from collections import OrderedDict, namedtuple
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from numpy import array, asarray, sqrt
+from numpy.random import RandomState
+from scipy.stats import norm
+
+from .addist import ad_unif
+from .cvmdist import cvm_unif
+from .ecdfgof import _frozen, critical_value, edf_field, edf_stats
+from .ksdist import ks_unif
+
+PowerCurve = namedtuple('PowerCurve', ('power', 'low', 'high'))
+
+# Statistic distributions for the tests, by EdfStats field.
+pdists = {'ks': ks_unif, 'cvm': cvm_unif, 'ad': ad_unif}
+
+# Number of values simulated at once.
+batch_size = 2 ** 20
+
+
+def power_curves(null, alternatives, sizes, args=(), tests=('ks', 'cvm', 'ad'),
+                 alpha=.05, rounds=10000, confidence=.95, workers=None,
+                 random_state=None):
+    """
+    Estimates the power of tests of fit to null for samples from alternatives.
+
+    Null may be given as for the simple tests (possibly with args), while
+    alternatives should be a frozen distribution or a sequence of them.
+    Tests may be given as statistic functions or EdfStats field names (of
+    the KS, CvM or AD tests). Each sample count is simulated rounds times for
+    each of the alternatives, with sample counts distributed over workers
+    threads (by default as many as processors); results do not depend on the
+    number of threads.
+
+    Returns power estimates and their confidence intervals for each test (in
+    a dictionary keyed by field names).
+    """
+    null = _frozen((), null, args)
+    if hasattr(alternatives, 'rvs'):
+        alternatives = (alternatives,)
+    fields = [edf_field(test) for test in tests]
+    for field in fields:
+        if field not in pdists:
+            raise ValueError("Only the KS, CvM and AD tests are supported.")
+    if not isinstance(random_state, RandomState):
+        random_state = RandomState(random_state)
+    seeds = random_state.randint(2 ** 31, size=len(sizes))
+
+    def simulate(task):
+        samples, seed = task
+        criticals = [critical_value(pdists[field], samples, alpha)
+                     for field in fields]
+        return _rejections(null, alternatives, samples, fields, criticals,
+                           rounds, RandomState(seed))
+
+    pool = ThreadPool(workers or cpu_count())
+    try:
+        # Rejection counts indexed by test, alternative and sample count.
+        counts = array(pool.map(simulate, zip(sizes, seeds)))
+        counts = counts.transpose(1, 2, 0)
+    finally:
+        pool.close()
+    return OrderedDict((field, _interval(count, rounds, confidence))
+                       for field, count in zip(fields, counts))
+
+
+def _rejections(null, alternatives, samples, fields, criticals, rounds, state):
+    """
+    Counts statistics above the critical values for samples from alternatives.
+    """
+    counts = [[0] * len(alternatives) for _ in fields]
+    rows = max(1, batch_size // samples)
+    for start in range(0, rounds, rows):
+        size = (min(rows, rounds - start), samples)
+        for a, alternative in enumerate(alternatives):
+            data = asarray(alternative.rvs(size=size, random_state=state),
+                           dtype=float)
+            data.sort(axis=1)
+            stats = edf_stats(null.cdf(data))
+            for f, (field, critical) in enumerate(zip(fields, criticals)):
+                counts[f][a] += (getattr(stats, field) > critical).sum()
+    return counts
+
+
+def _interval(count, rounds, confidence):
+    """
+    Estimates a proportion with Wilson's score interval.
+    """
+    z = norm.isf((1 - confidence) / 2)
+    proportion = count / rounds
+    scale = 1 + z ** 2 / rounds
+    centre = (proportion + z ** 2 / (2 * rounds)) / scale
+    half = z * sqrt(proportion * (1 - proportion) / rounds +
+                    z ** 2 / (4 * rounds ** 2)) / scale
+    return PowerCurve(proportion, centre - half, centre + half)
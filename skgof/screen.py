@@ -0,0 +1,124 @@
+"""
+Testing a single sample against many candidate distributions.
+
+The sample is sorted once, distribution functions of candidates from the same
+SciPy family are evaluated in a single broadcast call (a few candidates per
+row of a 2-D array), and statistics are computed for all rows at once.
+
+Example::
+
+    >>> from numpy import arange
+    >>> from scipy.stats import gamma, norm
+    >>> data = gamma(3).rvs(size=1000, random_state=1)
+    >>> table = screen(data, [norm(3, 1.7), gamma(3), gamma(2, scale=1.5)])
+    >>> table[0].dist.args
+    (3,)
+
+Candidates may also be given as a single frozen distribution with array
+parameters, each set of broadcast parameters making up a candidate::
+
+    >>> shapes = arange(1, 6)
+    >>> table = screen(data, gamma(shapes, scale=3 / shapes))
+    >>> table[0].dist.args
+    (3,)
+
+P-values may be limited to a few of the best candidates, saving most of
+their cost when the ranking is all that matters::
+
+    >>> table = screen(data, gamma(shapes, scale=3 / shapes), pvalues=2)
+    >>> [result.pvalue is None for result in table]
+    [False, False, True, True, True]
+"""
+from __future__ import division
+
+from collections import OrderedDict, namedtuple
+from functools import partial
+
+from numpy import asarray, broadcast_arrays, empty, sort
+
+from .addist import ad_unif
+from .ecdfgof import LazyResult, _sf, ad_stat, edf_stat
+
+ScreenResult = namedtuple('ScreenResult', ('statistic', 'pvalue', 'dist'))
+
+# Number of function values to compute and keep at once.
+chunk_size = 2 ** 22
+
+
+def screen(data, candidates, stat=ad_stat, pdist=ad_unif,
+           assume_sorted=False, pvalues=None):
+    """
+    Tests data against each of the candidate distributions.
+
+    Candidates should be frozen distributions, or a frozen distribution with
+    parameters broadcasting to a 1-D array. Statistic functions that accept
+    2-D arrays (such as `ks_stat()`, `cvm_stat()` or `ad_stat()`) or names of
+    `EdfStats` fields are supported.
+
+    Returns a list of (statistic, pvalue, dist) results, from the best
+    fitting candidate (with the least statistic) to the worst. If pvalues
+    is given, p-values are only computed (in a single call) for that many
+    of the best candidates, and are None for the others.
+    """
+    data = asarray(data)
+    if not assume_sorted:
+        data = sort(data)
+    candidates = _expand(candidates)
+    statistics = empty(len(candidates))
+    rows = max(1, chunk_size // max(1, len(data)))
+    for indices in _groups(candidates).values():
+        for start in range(0, len(indices), rows):
+            batch = indices[start:start + rows]
+            uniform = _cdfs([candidates[i] for i in batch], data)
+            statistics[batch] = edf_stat(stat, uniform)
+    order = statistics.argsort(kind='mergesort')
+    lazy = LazyResult(statistics, partial(_sf, pdist, len(data)))
+    selected = order[:pvalues]
+    known = dict(zip(selected, lazy.select(selected).pvalue))
+    return [ScreenResult(statistics[i], known.get(i), candidates[i])
+            for i in order]
+
+
+def _expand(candidates):
+    """
+    Splits a frozen distribution with array parameters into scalar ones.
+    """
+    if not hasattr(candidates, 'dist'):
+        return list(candidates)
+    family, args, kwds = candidates.dist, candidates.args, candidates.kwds
+    names = sorted(kwds)
+    arrays = broadcast_arrays(*(args + tuple(kwds[n] for n in names)))
+    return [family(*values[:len(args)],
+                   **dict(zip(names, values[len(args):])))
+            for values in zip(*[a.ravel() for a in arrays])]
+
+
+def _groups(candidates):
+    """
+    Groups indices of candidates that can be evaluated in a broadcast call.
+    """
+    groups = OrderedDict()
+    for index, candidate in enumerate(candidates):
+        family = getattr(candidate, 'dist', None)
+        if family is None:
+            key = index,
+        else:
+            key = (id(family), len(candidate.args),
+                   tuple(sorted(candidate.kwds)))
+        groups.setdefault(key, []).append(index)
+    return groups
+
+
+def _cdfs(candidates, data):
+    """
+    Evaluates distribution functions of candidates on data, one per row.
+    """
+    first = candidates[0]
+    if len(candidates) == 1 or not hasattr(first, 'dist'):
+        return asarray([candidate.cdf(data) for candidate in candidates])
+    names = sorted(first.kwds)
+    args = [asarray([c.args[i] for c in candidates])[:, None]
+            for i in range(len(first.args))]
+    kwds = dict((name, asarray([c.kwds[name] for c in candidates])[:, None])
+                for name in names)
+    return first.dist.cdf(data, *args, **kwds)
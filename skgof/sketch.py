@@ -0,0 +1,221 @@
+"""
+Mergeable summaries of data streams, for approximate tests of fit to a fixed
+distribution.
+
+As the hypothesized distribution is known up front, values can be passed
+through its distribution function as they arrive and counted in equal-width
+bins over [0, 1]. The bin counts (plus the least and greatest value) fix the
+empirical distribution function at the bin edges, which is enough to bound the
+Kolmogorov-Smirnov, Cramer-von Mises and Anderson-Darling statistics from
+both sides, with the KS bounds less than about two bin widths apart.
+Summaries take constant space and ones built for the same distribution and
+number of bins may be merged exactly, for instance to combine data from a
+number of hosts::
+
+    >>> from scipy.stats import norm
+    >>> a, b = EdfSketch(norm(0, 1)), EdfSketch(norm(0, 1))
+    >>> a.update(norm(0, 1).rvs(size=10000, random_state=1))
+    >>> b.update(norm(0, 1).rvs(size=10000, random_state=2))
+    >>> a.merge(b)
+    >>> result = a.ks()
+    >>> result.bounds[0] <= result.statistic <= result.bounds[1]
+    True
+
+The statistic returned is the middle of its bounds, and the p-value is
+computed for it using the usual distribution (with the bounds translated to
+p-value bounds).
+"""
+from __future__ import division
+
+from collections import namedtuple
+
+from numpy import (absolute, asarray, bincount, clip, concatenate, cumsum,
+                   errstate, inf, int64, linspace, maximum, minimum, where,
+                   zeros)
+from scipy.special import xlogy
+
+from .addist import ad_unif
+from .cvmdist import cvm_unif
+from .ecdfgof import _frozen, ad_stat, cvm_stat, edf_field, ks_stat
+from .ksdist import ks_unif
+
+BinnedStats = namedtuple('BinnedStats', ('ks', 'cvm', 'ad'))
+Bounded = namedtuple('Bounded', ('estimate', 'low', 'high'))
+SketchResult = namedtuple('SketchResult', ('statistic', 'pvalue', 'bounds',
+                                           'pvalue_bounds'))
+
+
+class EdfSketch(object):
+    """
+    Counts of distribution function values of a stream in equal-width bins.
+    """
+    def __init__(self, dist, args=(), bins=4096):
+        self.dist = _frozen((), dist, args)
+        self.counts = zeros(bins, int64)
+        self.first, self.last = inf, -inf
+
+    @property
+    def samples(self):
+        return self.counts.sum()
+
+    def update(self, values):
+        """
+        Adds a chunk of values to the summary.
+        """
+        uniform = asarray(self.dist.cdf(values)).ravel()
+        if len(uniform) == 0:
+            return
+        bins = len(self.counts)
+        indices = minimum((uniform * bins).astype(int), bins - 1)
+        self.counts += bincount(indices, minlength=bins)
+        self.first = min(self.first, uniform.min())
+        self.last = max(self.last, uniform.max())
+
+    def merge(self, other):
+        """
+        Adds the counts from a summary made with the same distribution.
+        """
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Summaries should have the same number of bins.")
+        self.counts += other.counts
+        self.first = min(self.first, other.first)
+        self.last = max(self.last, other.last)
+
+    def stats(self):
+        """
+        Estimates and bounds the KS, CvM and AD statistics of all the values.
+        """
+        edges = linspace(0, 1, len(self.counts) + 1)
+        return binned_stats(edges, self.counts, self.first, self.last)
+
+    def test(self, stat=ad_stat, pdist=ad_unif):
+        """
+        Approximates one of the KS, CvM and AD tests for all the values.
+        """
+        return _bounded_test(self.stats(), self.samples, stat, pdist)
+
+    def ks(self):
+        return self.test(ks_stat, ks_unif)
+
+    def cvm(self):
+        return self.test(cvm_stat, cvm_unif)
+
+    def ad(self):
+        return self.test(ad_stat, ad_unif)
+
+
+def histogram_test(edges, counts, dist, args=(), stat=ad_stat, pdist=ad_unif,
+                   first=None, last=None):
+    """
+    Tests goodness of fit to dist of a sample known only through a histogram.
+
+    Edges should be increasing bin boundaries and counts the numbers of values
+    in the bins (one less than edges); first and last, if known, should be the
+    least and the greatest of the values. The distribution function is only
+    evaluated at the edges, and the statistic is estimated and bounded as
+    by `binned_stats()`. The p-value is computed for the total count.
+    """
+    dist = _frozen(edges, dist, args)
+    counts = asarray(counts)
+    if first is not None:
+        first = dist.cdf(first)
+    if last is not None:
+        last = dist.cdf(last)
+    stats = binned_stats(dist.cdf(edges), counts, first, last)
+    return _bounded_test(stats, counts.sum(), stat, pdist)
+
+
+def _bounded_test(stats, samples, stat, pdist):
+    """
+    Builds the result of an approximate test from binned statistics.
+    """
+    field = edf_field(stat)
+    if field not in BinnedStats._fields:
+        raise ValueError("Only the KS, CvM and AD statistics are bounded.")
+    statistic, low, high = getattr(stats, field)
+    dist = pdist(samples)
+    return SketchResult(statistic, dist.sf(statistic), (low, high),
+                        (dist.sf(high), dist.sf(low)))
+
+
+def binned_stats(edges, counts, first=None, last=None):
+    """
+    Estimates and bounds KS, CvM and AD statistics of binned U(0, 1) values.
+
+    Edges should be a nondecreasing sequence of values from [0, 1] and counts
+    tell how many values fell in each of the bins; bins are assumed to include
+    their left edges. First and last, if known, should be the least and the
+    greatest of the values; without them the AD upper bound is infinite,
+    unless the first and last bins do not reach 0 and 1.
+
+    The bounds hold for any placement of values within bins. The KS estimate
+    is the middle of the bounds, while the CvM and AD ones assume that values
+    are spread evenly within bins (as is expected under the hypothesis);
+    the bounds for these are much wider, of the order of the square root of
+    the sample count divided by the number of bins.
+
+    Returns a BinnedStats tuple of (estimate, low, high) triples.
+    """
+    edges = asarray(edges, dtype=float)
+    counts = asarray(counts)
+    samples = counts.sum()
+    cumulative = concatenate(((0,), cumsum(counts))) / samples
+    # Segments of [0, 1] with the empirical function known to be in [c0, c1];
+    # it is known exactly below the first and above the last edge.
+    a = concatenate(((0,), edges[:-1], edges[-1:]))
+    b = concatenate((edges[:1], edges[1:], (1,)))
+    c0 = concatenate(((0,), cumulative[:-1], (1,)))
+    c1 = concatenate(((0,), cumulative[1:], (1,)))
+    if first is not None:
+        a, b = maximum(a, first), maximum(b, first)
+        a, b = concatenate(((0,), a)), concatenate(((first,), b))
+        c0, c1 = concatenate(((0,), c0)), concatenate(((0,), c1))
+    if last is not None:
+        a, b = minimum(a, last), minimum(b, last)
+        a, b = concatenate((a, (last,))), concatenate((b, (1,)))
+        c0, c1 = concatenate((c0, (1,))), concatenate((c1, (1,)))
+    exact = c0 == c1
+    # The function attains c0 after a and c1 before b.
+    ks_low = where(exact, maximum(absolute(c0 - a), absolute(c0 - b)),
+                   maximum(c1 - b, a - c0)).max()
+    ks_high = maximum(c1 - a, b - c0).max()
+    stats = [Bounded((ks_low + ks_high) / 2, ks_low, ks_high)]
+    # For the upper bounds the integrand is taken at the farther end of
+    # [c0, c1], for the lower ones at the nearer point of [c0, c1]; for
+    # the estimates the function is interpolated linearly within segments.
+    middle = clip((c0 + c1) / 2, a, b)
+    lows = (a, clip(c0, a, b)), (clip(c1, a, b), b)
+    highs = (a, middle), (middle, b)
+    width = b - a
+    slope = where(width > 0, (c1 - c0) / where(width > 0, width, 1), 0) - 1
+    offset = c0 - a - slope * a
+    # Steps of the function add about 1 / 12n to the (interpolated) CvM.
+    for integral, steps in ((_cvm_integral, 1 / (12 * samples ** 2)),
+                            (_ad_integral, 0)):
+        low = (integral(c0, 0, *lows[0]) + integral(c1, 0, *lows[1])).sum()
+        high = (integral(c1, 0, *highs[0]) + integral(c0, 0, *highs[1])).sum()
+        estimate = integral(offset, slope, a, b).sum() + steps
+        stats.append(Bounded(samples * clip(estimate, low, high),
+                             samples * low, samples * high))
+    return BinnedStats(*stats)
+
+
+def _cvm_integral(c, s, a, b):
+    """
+    Integrates (c + s u)^2 over [a, b] (with the given s = 0 meaning -1).
+    """
+    s = where(s == 0, -1, s)
+    ga, gb = c + s * a, c + s * b
+    return (b - a) * (ga ** 2 + ga * gb + gb ** 2) / 3
+
+
+def _ad_integral(c, s, a, b):
+    """
+    Integrates (c + s u)^2 / (u (1 - u)) over [a, b] (s = 0 meaning -1).
+    """
+    s = where(s == 0, -1, s)
+    c2, d2 = c ** 2, (c + s) ** 2
+    with errstate(invalid='ignore'):
+        integral = ((a - b) * s ** 2 + xlogy(c2, b) - xlogy(c2, a) +
+                    xlogy(d2, 1 - a) - xlogy(d2, 1 - b))
+    return where(a < b, integral, 0)
@@ -3,11 +3,15 @@ A primitive statistic distribution simulation.
 """
 from __future__ import division
 
-from numpy import fromiter
-from numpy.random import random_sample
+from numpy import arange, concatenate, fromiter
+from numpy.random import RandomState, random_sample
 
+# Number of values generated at once for vectorized statistics.
+batch_size = 2 ** 20
 
-def simulator(stat, samples, precision, rounds):
+
+def simulator(stat, samples, precision, rounds, weights=None, dimensions=None,
+              vectorized=False, random_state=None):
     """
     Simulates a distribution-free statistical test to estimate its p-values.
 
@@ -26,8 +30,20 @@ def simulator(stat, samples, precision, rounds):
     generation and statistic calculation. The more rounds the higher the
     quality of the results. Must be a (large) multiple of precision.
 
+    The optional fifth argument, weights, gives weights of the samples (one
+    for each); they are reordered together with the generated values and
+    passed to the statistic function as a weights keyword argument.
+
+    Multivariate statistics may ask for points with a number of dimensions
+    (uniform over the unit cube); the points are then not sorted. Vectorized
+    statistics are given batches of samples (rows of a 2-D array, or of a
+    3-D one for points) and should return arrays of values (weights are not
+    supported for them). Random state
+    may be given to make the simulation repeatable.
+
     Example::
 
+        import numpy
         from skgof.testsim import simulator
         from skgof.ecdfgof import ks_stat
 
@@ -36,11 +52,37 @@ def simulator(stat, samples, precision, rounds):
 
         # Get the approximate 95% critical value (to about 2 decimal digits).
         ks10[94]  # 0.409...
+
+        # Weighted samples behave about as ones of the effective size (~37).
+        weights = numpy.linspace(1, 3, 40)
+        simulator(ks_stat, 40, 100, 1e5, weights)[94]  # 0.22...
     """
     rounds = int(rounds)
-    data = random_sample(size=(rounds, samples))
-    data.sort(axis=1)
-    stats = fromiter((stat(d) for d in data), float, rounds)
+    generate = random_sample if random_state is None else \
+        RandomState(random_state).random_sample
+    size = (samples,) if dimensions is None else (samples, dimensions)
+    if vectorized:
+        rows = max(1, batch_size // (samples * (dimensions or 1)))
+        batches = []
+        for start in range(0, rounds, rows):
+            data = generate(size=(min(rows, rounds - start),) + size)
+            if dimensions is None:
+                data.sort(axis=1)
+            batches.append(stat(data))
+        stats = concatenate(batches)
+    elif dimensions is not None:
+        stats = fromiter((stat(generate(size=size)) for _ in range(rounds)),
+                         float, rounds)
+    elif weights is None:
+        data = generate(size=(rounds, samples))
+        data.sort(axis=1)
+        stats = fromiter((stat(d) for d in data), float, rounds)
+    else:
+        data = generate(size=(rounds, samples))
+        orders = data.argsort(axis=1)
+        data = data[arange(rounds)[:, None], orders]
+        stats = fromiter((stat(d, weights=weights[o])
+                          for d, o in zip(data, orders)), float, rounds)
     stats.sort()
     step = int(rounds / precision)
     return stats[step:rounds:step]
@@ -0,0 +1,238 @@
+"""
+Goodness-of-fit monitoring of the most recent values of a stream.
+
+`WindowMonitor` keeps the last few values (as distribution function values)
+in a list of short sorted blocks, each with a few sums and maxima over its
+values. Inserting a value or evicting one only updates a single block, while
+the statistics of the whole window can be assembled from the per-block
+summaries, taking time proportional to the number of blocks. With blocks
+of about the square root of the window size, updates and queries cost about
+that many operations (instead of sorting the whole window each time).
+`drift()` only needs the KS maxima of the blocks, so it does not refresh the
+other sums. Values given one at a time are buffered and passed through the
+distribution function in batches, as a vectorized call.
+
+Blocks are plain lists (bisecting and inserting into a short list is
+cheaper than any array operation), converted to arrays only to refresh the
+summaries of changed blocks. With a window of 10^4 normal values, adding
+values one at a time takes about 5 us per value, 10 us with a `drift()`
+check every 256 values and 20 us with one every 64. A check after every
+value costs about 120 us per value, mostly spent on distribution function
+calls for single values.
+
+Example::
+
+    >>> from scipy.stats import norm
+    >>> monitor = WindowMonitor(norm(0, 1), window=1000, alpha=.01)
+    >>> for value in norm(0, 1).rvs(size=1500, random_state=1):
+    ...     monitor.update(value)
+    >>> monitor.drift()
+    False
+    >>> monitor.update(norm(1, 1).rvs(size=500, random_state=2))
+    >>> monitor.drift()
+    True
+"""
+from __future__ import division
+
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+from numpy import (arange, array, atleast_1d, cumsum, dot, fromiter, inf, log,
+                   log1p, ndim)
+
+from .ecdfgof import EdfStats, GofResult, _frozen, critical_value
+from .ksdist import ks_unif
+
+
+class WindowMonitor(object):
+    """
+    Tracks EDF statistics of the last window values of a stream.
+
+    Values are passed through the distribution function and tested against
+    the uniform distribution. Alpha sets the significance level for `drift()`
+    (that needs it); the critical value of the KS statistic for a full window
+    is taken from `critical_value()`, once. Up to batch values are buffered
+    before they are added to the window (queries add any buffered values
+    first).
+
+    The monitor keeps up with about 200k values per second when only adding
+    them and with 100k when checking for drift every 256 values, but only
+    with about 50k when checking every 64 values and 8k when checking after
+    every value (as the distribution function is then called for single
+    values), for a window of 10^4 values.
+    """
+    def __init__(self, dist, window, args=(), alpha=None, block_size=None,
+                 batch=64):
+        self.dist = _frozen((), dist, args)
+        self.window = window
+        if block_size is None:
+            block_size = max(16, int(window ** .5))
+        self.block_size = block_size
+        self.batch = batch
+        self.pending = []
+        self.values = deque()
+        self.blocks = []
+        self.firsts = []
+        self.sums = []
+        # Greatest KS differences in blocks, scaled by the sample count.
+        self.plus = []
+        self.minus = []
+        self.scale = 0
+        self.indices = arange(2 * block_size + 1)
+        self.pdist = ks_unif(window)
+        self.critical = None if alpha is None else \
+            critical_value(ks_unif, window, alpha)
+
+    def __len__(self):
+        return min(self.window, len(self.values) + len(self.pending))
+
+    def update(self, values):
+        """
+        Adds a value or a sequence of values, evicting the oldest ones.
+        """
+        if ndim(values) == 0:
+            self.pending.append(values)
+            if len(self.pending) < self.batch:
+                return
+            values = self.pending
+        elif self.pending:
+            values = self.pending + list(values)
+        self.pending = []
+        for value in atleast_1d(self.dist.cdf(values)).tolist():
+            self.values.append(value)
+            self._insert(value)
+            if len(self.values) > self.window:
+                self._remove(self.values.popleft())
+
+    def stats(self):
+        """
+        Calculates EDF statistics (as `edf_stats()`) for the current window.
+        """
+        d_plus, d_minus = self._ks()
+        samples = len(self.values)
+        for b, block in enumerate(self.blocks):
+            if self.sums[b] is None:
+                self.sums[b] = self._sums(block)
+        counts = array([len(block) for block in self.blocks])
+        starts = cumsum(counts) - counts
+        total, squares, ranked, logs, logs1, ranked_logs, ranked_logs1 = \
+            array(self.sums).T
+        factors = 2 * starts + 1
+        cvm = (samples / 3 + squares.sum() -
+               (dot(factors, total) + 2 * ranked.sum()) / samples)
+        watson = cvm - samples * (total.sum() / samples - .5) ** 2
+        ad = -samples - (dot(factors, logs) + 2 * ranked_logs.sum() +
+                         dot(2 * samples - factors, logs1) -
+                         2 * ranked_logs1.sum()) / samples
+        return EdfStats(d_plus, d_minus, max(d_plus, d_minus),
+                        d_plus + d_minus, cvm, watson, ad)
+
+    def test(self):
+        """
+        Runs the KS test on the current window.
+        """
+        statistic = max(self._ks())
+        samples = len(self.values)
+        pdist = self.pdist if samples == self.window else ks_unif(samples)
+        return GofResult(statistic, pdist.sf(statistic))
+
+    def drift(self):
+        """
+        Tells if the full window fails the KS test at the alpha level.
+        """
+        if self.critical is None:
+            raise ValueError("Alpha is needed to check for drift.")
+        if len(self) < self.window:
+            return False
+        return max(self._ks()) > self.critical
+
+    def _ks(self):
+        """
+        Gives the KS statistics of the window from the maxima of its blocks.
+        """
+        if self.pending:
+            self.update(())
+        samples = len(self.values)
+        if samples != self.scale:
+            self.plus = [None] * len(self.blocks)
+            self.minus = [None] * len(self.blocks)
+            self.scale = samples
+        if None in self.plus:
+            for b, plus in enumerate(self.plus):
+                if plus is None:
+                    self.plus[b], self.minus[b] = self._maxima(self.blocks[b])
+        # A plain loop over the few blocks beats building arrays of them.
+        d_plus = d_minus = -inf
+        start = 0
+        for block, plus, minus in zip(self.blocks, self.plus, self.minus):
+            if start + plus > d_plus:
+                d_plus = start + plus
+            if minus - start > d_minus:
+                d_minus = minus - start
+            start += len(block)
+        return d_plus / samples, d_minus / samples
+
+    def _insert(self, value):
+        if not self.blocks:
+            self._replace(0, [value])
+            return
+        b = max(0, bisect_right(self.firsts, value) - 1)
+        block = self.blocks[b]
+        insort(block, value)
+        if len(block) > 2 * self.block_size:
+            middle = len(block) // 2
+            self._replace(b, block[:middle])
+            self.blocks.insert(b + 1, None)
+            self.firsts.insert(b + 1, None)
+            self.sums.insert(b + 1, None)
+            self.plus.insert(b + 1, None)
+            self.minus.insert(b + 1, None)
+            self._replace(b + 1, block[middle:])
+        else:
+            self._replace(b, block)
+
+    def _remove(self, value):
+        # Equal values spanning blocks are also in the last such block.
+        b = bisect_right(self.firsts, value) - 1
+        block = self.blocks[b]
+        del block[bisect_left(block, value)]
+        if not block:
+            del self.blocks[b], self.firsts[b], self.sums[b]
+            del self.plus[b], self.minus[b]
+        else:
+            self._replace(b, block)
+
+    def _replace(self, b, block):
+        if b == len(self.blocks):
+            self.blocks.append(block)
+            self.firsts.append(block[0])
+            self.sums.append(None)
+            self.plus.append(None)
+            self.minus.append(None)
+        else:
+            self.blocks[b] = block
+            self.firsts[b] = block[0]
+            self.sums[b] = None
+            self.plus[b] = None
+            self.minus[b] = None
+
+    def _sums(self, block):
+        """
+        Sums of values, squares and logarithms, plain and weighted by rank.
+        """
+        block = fromiter(block, float, len(block))
+        indices = self.indices[:len(block)]
+        logs, logs1 = log(block), log1p(-block)
+        return (block.sum(), dot(block, block), dot(indices, block),
+                logs.sum(), logs1.sum(), dot(indices, logs),
+                dot(indices, logs1))
+
+    def _maxima(self, block):
+        """
+        Maxima of KS differences, scaled by the sample count and up to offset.
+        """
+        # Differences of ranks and scaled values, negated in place.
+        differences = fromiter(block, float, len(block))
+        differences *= -self.scale
+        differences += self.indices[:len(block)]
+        return float(differences.max()) + 1, -float(differences.min())
@@ -0,0 +1,55 @@
+from __future__ import division
+
+from numpy import allclose, arange, array, sort, sqrt
+from numpy.random import RandomState
+from scipy.stats import norm
+
+from skgof.bands import (band_coverage, beta_band, beta_level, ks_band,
+                         ks_bands, ks_critical)
+from skgof.ecdfgof import critical_value
+from skgof.ksdist import ks_unif
+
+
+class BandTests:
+    def test_critical(self):
+        counts = array((5, 50, 140, 1000, 50, 5))
+        criticals = ks_critical(counts, .05)
+        for count, critical in zip(counts, criticals):
+            assert allclose(ks_unif(count).sf(critical), .05, rtol=1e-10)
+        assert allclose(criticals, [critical_value(ks_unif, count, .05)
+                                    for count in counts], rtol=1e-10)
+
+    def test_ks_band(self):
+        data = norm.rvs(size=(3, 40), random_state=1)
+        band = ks_band(data, alpha=.1)
+        assert (band.values == sort(data)).all()
+        critical = ks_critical(40, .1)
+        assert allclose(band.upper, (arange(41) / 40 + critical).clip(max=1))
+        assert band.lower[0] == 0 and band.upper[-1] == 1
+        bands = ks_bands((data[0], data[1, :25]), alpha=.1)
+        assert allclose(bands[0].lower, band.lower)
+        assert len(bands[1].lower) == 26
+
+    def test_coverage(self):
+        # Bounds of a constant width band give the KS distribution.
+        for samples in (3, 10, 50):
+            statistic = 1.1 / sqrt(samples)
+            orders = arange(1, samples + 1)
+            lower = (orders / samples - statistic).clip(min=0)
+            upper = ((orders - 1) / samples + statistic).clip(max=1)
+            assert allclose(band_coverage(lower, upper),
+                            ks_unif(samples).cdf(statistic), rtol=1e-12)
+
+    def test_beta_band(self):
+        level = beta_level(30, .05)
+        assert .05 / 30 < level < .05
+        band = beta_band(norm.rvs(size=30, random_state=2), .05)
+        assert (band.lower[1:] < band.upper[:-1]).all()
+        # Simulated coverage of the uniform order statistics.
+        uniform = sort(RandomState(3).random_sample((100000, 30)), axis=1)
+        covered = ((uniform >= band.lower[1:]) &
+                   (uniform <= band.upper[:-1])).all(axis=1)
+        assert abs(covered.mean() - .95) < .003
+        # Tails are narrower than the KS band's.
+        ks = ks_band(band.values, .05)
+        assert band.upper[0] < ks.upper[0]
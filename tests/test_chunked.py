@@ -0,0 +1,99 @@
+from __future__ import division
+
+from functools import partial
+
+from numpy import allclose, arange, concatenate, isclose, save, sort
+from numpy.random import RandomState
+from numpy.testing import assert_array_equal
+from scipy.stats import norm, uniform
+from pytest import raises
+
+from skgof.addist import ad_unif
+from skgof.chunked import external_test, merge_runs, sharded_test
+from skgof.cvmdist import cvm_unif
+from skgof.ecdfgof import (ad_stat, ad_test, cvm_stat, cvm_test, ks_stat,
+                           ks_test)
+from skgof.ksdist import ks_unif
+
+allclose = partial(allclose, atol=0, rtol=.5e-10)
+isclose = partial(isclose, atol=0, rtol=.5e-10)
+
+
+class ExternalTests:
+    def test_simple(self):
+        # Should give the same results as the in-memory tests.
+        data = norm(.1, 1).rvs(random_state=3, size=1000)
+        dist = norm(0, 1)
+        for test, stat, pdist in ((ks_test, ks_stat, ks_unif),
+                                  (cvm_test, cvm_stat, cvm_unif),
+                                  (ad_test, ad_stat, None)):
+            expected = test(data, dist)
+            for chunk_size in (1000, 99, 7):
+                kwargs = {'stat': stat, 'chunk_size': chunk_size}
+                if pdist is not None:
+                    kwargs['pdist'] = pdist
+                assert allclose(external_test(data, dist, **kwargs), expected)
+
+    def test_ties(self):
+        data = (norm(0, 1).rvs(random_state=4, size=500) * 4).round()
+        dist = norm(0, 4)
+        result = external_test(data, dist, stat=ks_stat, pdist=ks_unif,
+                               chunk_size=30)
+        assert allclose(result, ks_test(data, dist))
+
+    def test_files(self, tmpdir):
+        data = uniform(0, 2).rvs(random_state=5, size=300)
+        expected = cvm_test(data, uniform(0, 2))
+        name = str(tmpdir.join('data.npy'))
+        save(name, data)
+        result = external_test(name, uniform(0, 2), stat=cvm_stat,
+                               pdist=cvm_unif, chunk_size=50,
+                               tmpdir=str(tmpdir))
+        assert allclose(result, expected)
+        name = str(tmpdir.join('data.bin'))
+        data.astype('f4').tofile(name)
+        result = external_test(name, uniform(0, 2), stat=cvm_stat,
+                               pdist=cvm_unif, chunk_size=50, dtype='f4')
+        assert isclose(result.statistic, expected.statistic, rtol=.5e-5)
+        # Temporary files should be removed.
+        assert sorted(f.basename for f in tmpdir.listdir()) == ['data.bin',
+                                                                'data.npy']
+
+    def test_stat(self):
+        with raises(ValueError):
+            external_test((.1, .2), uniform(0, 1), stat=lambda data: 0)
+
+
+class MergeTests:
+    def test_merge(self):
+        random = RandomState(6)
+        runs = [sort(random.randint(0, 50, size)) for size in (0, 1, 40, 99)]
+        for chunk_size in (1, 5, 64, 1000):
+            blocks = list(merge_runs(runs, chunk_size))
+            assert all(len(b) <= max(chunk_size, len(runs)) for b in blocks)
+            assert_array_equal(concatenate(blocks),
+                               sort(concatenate(runs)))
+        assert_array_equal(concatenate(list(merge_runs([arange(3)], 2))),
+                           arange(3))
+
+
+class ShardedTests:
+    def test_simple(self):
+        data = norm(.1, 1).rvs(random_state=8, size=1000)
+        shards = [sort(data[:10]), sort(data[10:600]), sort(data[600:]),
+                  data[:0]]
+        dist = norm(0, 1)
+        for test, stat, pdist in ((ks_test, ks_stat, ks_unif),
+                                  (ad_test, ad_stat, ad_unif)):
+            expected = test(data, dist)
+            result = sharded_test(shards, dist, stat=stat, pdist=pdist,
+                                  workers=3, chunk_size=64)
+            assert allclose(result, expected)
+
+    def test_ties(self):
+        # Equal values in different shards.
+        data = (norm(0, 1).rvs(random_state=9, size=400) * 3).round()
+        shards = [sort(data[:150]), sort(data[150:])]
+        result = sharded_test(shards, norm(0, 3), stat=cvm_stat,
+                              pdist=cvm_unif)
+        assert allclose(result, cvm_test(data, norm(0, 3)))
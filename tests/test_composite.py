@@ -0,0 +1,84 @@
+from __future__ import division
+
+from os import listdir, path
+
+from numpy import allclose, arange, isclose, save, sort
+from scipy.stats import expon, gamma, laplace, norm, uniform
+
+from skgof import composite
+from skgof.composite import composite_test, estimate, null_distribution
+from skgof.ecdfgof import ad_stat, ks_stat
+
+data = norm(3, 2).rvs(random_state=16, size=100)
+
+
+class CompositeTests:
+    def test_estimate(self):
+        rows = sort(norm.rvs(random_state=17, size=(3, 50)), axis=1)
+        for family in (norm, laplace):
+            estimates = estimate(family, rows)
+            for index, row in enumerate(rows):
+                assert allclose([e[index] for e in estimates],
+                                family.fit(row), rtol=1e-4)
+        loc, scale = estimate(expon, rows[0])
+        assert loc < rows[0, 0] and isclose(scale, (rows[0].mean() - loc))
+        loc, scale = estimate(uniform, rows[0])
+        assert loc < rows[0, 0] and loc + scale > rows[0, -1]
+
+    def test_null(self):
+        # The Lilliefors critical value: about .886 / sqrt(n) for n = 100.
+        null = null_distribution(norm, ks_stat, 100, 20000, cachedir=None,
+                                 random_state=1)
+        assert isclose(null[int(.95 * len(null))], .0886, rtol=.03)
+        composite.null_cache.clear()
+
+    def test_composite(self, tmpdir):
+        cachedir = str(tmpdir)
+        result = composite_test(data, 'norm', ad_stat, rounds=2000,
+                                cachedir=cachedir, random_state=1)
+        assert result.pvalue > .05
+        assert listdir(cachedir) == ['norm-ad-100.npy']
+        # Reused from memory and then from disk.
+        assert composite_test(data, norm, ad_stat, cachedir=cachedir,
+                              rounds=2000) == result
+        composite.null_cache.clear()
+        assert composite_test(data, norm, ad_stat, cachedir=cachedir,
+                              rounds=2000) == result
+        composite.null_cache.clear()
+        # Exponential data is not normal.
+        skewed = expon(0, 2).rvs(random_state=18, size=100)
+        result = composite_test(skewed, 'norm', 'cvm', rounds=2000,
+                                cachedir=cachedir, random_state=1)
+        assert result.pvalue < .01
+        assert composite_test(skewed, 'expon', 'cvm', rounds=2000,
+                              cachedir=cachedir).pvalue > .05
+        composite.null_cache.clear()
+
+    def test_shapes(self, tmpdir):
+        # Nulls for families with shape parameters are not cached.
+        sample = gamma(2).rvs(random_state=19, size=30)
+        result = composite_test(sample, gamma, 'ks', rounds=50,
+                                cachedir=str(tmpdir), random_state=1)
+        assert 0 < result.pvalue <= 1
+        assert listdir(str(tmpdir)) == []
+
+    def test_custom(self, tmpdir):
+        # Custom statistics are not cached, lambdas could get mixed up.
+        cachedir = str(tmpdir)
+        first = composite_test(data, norm, lambda u: u.max(axis=-1),
+                               rounds=500, cachedir=cachedir, random_state=1)
+        second = composite_test(data, norm, lambda u: u.min(axis=-1),
+                                rounds=500, cachedir=cachedir, random_state=1)
+        assert first.pvalue != second.pvalue
+        assert listdir(cachedir) == [] and not composite.null_cache
+
+    def test_stored(self, tmpdir):
+        # Files that are not sorted arrays of floats are not trusted.
+        cachedir = str(tmpdir)
+        result = composite_test(data, norm, 'ks', rounds=500,
+                                cachedir=cachedir, random_state=1)
+        composite.null_cache.clear()
+        save(path.join(cachedir, 'norm-ks-100.npy'), arange(500.)[::-1])
+        assert composite_test(data, norm, 'ks', rounds=500, cachedir=cachedir,
+                              random_state=1) == result
+        composite.null_cache.clear()
@@ -0,0 +1,70 @@
+from __future__ import division
+
+from functools import partial
+from itertools import product
+
+from numpy import allclose, array, asarray, isclose, maximum, prod, where
+from scipy.stats import binom, norm, poisson, rv_discrete
+
+from skgof.discrete import jumps, ks_discrete_stat, ks_discrete_test
+from skgof.ksdist import ks_discrete_sf, ks_unif
+
+isclose = partial(isclose, atol=0, rtol=1e-10)
+
+
+class censored:
+    # Normal distribution censored at zero, with an atom of 1/2 there.
+    def cdf(self, values):
+        return where(asarray(values) < 0, 0., norm.cdf(values))
+
+
+class DiscreteTests:
+    def test_stat(self):
+        # Jumps are compared just before and at the values.
+        assert isclose(ks_discrete_stat((0, 1, 1), binom(2, .5)), .25)
+        assert ks_discrete_stat((2, 0, 1, 1), binom(2, .5)) == 0
+        rows = ks_discrete_stat(((0, 1, 1), (2, 2, 2)), binom(2, .5))
+        assert allclose(rows, (.25, .75))
+
+    def test_enumerated(self):
+        # Probabilities summed over all samples of a few values.
+        dist = binom(3, .4)
+        samples = tuple(product(range(4), repeat=5))
+        statistics = ks_discrete_stat(samples, dist)
+        probabilities = prod(dist.pmf(samples), axis=1)
+        lows, highs = jumps(dist)
+        for statistic in (.1, .2, .3, .4, .6, .8):
+            expected = probabilities[statistics >= statistic - 1e-12].sum()
+            assert isclose(ks_discrete_sf(statistic, 5, lows, highs),
+                           expected)
+        custom = rv_discrete(values=((1, 2, 5), (.2, .5, .3)))
+        assert allclose(jumps(custom()), ((0, .2, .7), (.2, .7, 1)))
+
+    def test_continuous(self):
+        # Without jumps the test should match the usual one.
+        for samples in (5, 20, 100):
+            statistics = array((.1, .2, .3, .5))
+            assert allclose(ks_discrete_sf(statistics, samples, (), ()),
+                            ks_unif(samples).sf(statistics), rtol=1e-12)
+
+    def test_mixed(self):
+        # Checked with a simulation of a million samples.
+        lows, highs = jumps(censored(), (0,))
+        assert allclose((lows, highs), ((0,), (.5,)))
+        assert isclose(ks_discrete_sf(.23, 20, lows, highs), .13476,
+                       rtol=.01)
+        data = maximum(norm.rvs(random_state=3, size=50), 0)
+        result = ks_discrete_test(data, censored(), atoms=(0,))
+        assert 0 < result.pvalue < 1
+
+    def test_test(self):
+        data = poisson(3).rvs(size=1000, random_state=4)
+        result = ks_discrete_test(data, poisson(3))
+        assert isclose(result.statistic, ks_discrete_stat(data, poisson(3)))
+        # Continuous distribution p-values are conservative.
+        assert result.pvalue < ks_unif(1000).sf(result.statistic)
+        assert ks_discrete_test(data, poisson(3.2)).pvalue < .01
+        rows = data.reshape(4, 250)
+        results = ks_discrete_test(rows, 'poisson', (3,))
+        for row, statistic, pvalue in zip(rows, *results):
+            assert isclose(ks_discrete_test(row, poisson(3)).pvalue, pvalue)
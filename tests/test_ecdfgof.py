@@ -3,12 +3,22 @@ from __future__ import division
 from collections import namedtuple
 from functools import partial
 
-from numpy import allclose, array, isclose, linspace
-from scipy.stats import norm, uniform
-from pytest import mark
+from numpy import (allclose, arange, array, dtype, empty, float32, isclose,
+                   linspace, memmap, repeat, sort, unique)
+from numpy.testing import assert_array_equal
+from pytest import importorskip, mark, raises
+from scipy.stats import norm, rv_continuous, uniform
 
-from skgof.ecdfgof import (ad_stat, ad_test, cvm_stat, cvm_test,
-                           ks_stat, ks_test, simple_test)
+from skgof.addist import ad_unif
+from skgof.cvmdist import cvm_unif
+from skgof.ecdfgof import (EdfAccumulator, GofResult, LazyResult,
+                           PreparedSample, _runs, ad_stat, ad_test,
+                           clear_caches, critical_cache, critical_cache_size,
+                           critical_value, cvm_stat, cvm_test, edf_stat,
+                           edf_stats, effective_size, grid_cache,
+                           grouped_stats, grouped_test, is_sorted, ks_stat,
+                           ks_test, simple_test, weighted_stats)
+from skgof.ksdist import ks_unif
 
 data1 = array((.125, .375, .625, .875))
 data2 = array((.1, .2, .3, .4))
@@ -19,6 +29,12 @@ allclose = partial(allclose, atol=0, rtol=.5e-5)
 isclose = partial(isclose, atol=0, rtol=.5e-5)
 
 
+class spread_gen(rv_continuous):
+    # A statistic uniform over the support, for any sample count.
+    def _cdf(self, statistic, samples):
+        return statistic / self.b
+
+
 class StatisticTests:
     def test_ks_stat(self):
         assert isclose(ks_stat(data1), .125)
@@ -35,6 +51,98 @@ class StatisticTests:
         assert isclose(ad_stat(data2), 1.749722)
         assert isclose(ad_stat(data3), 1.749722)
 
+    def test_edf_stats(self):
+        stats = edf_stats(data1)
+        assert allclose(stats, (.125, .125, .125, .25, .0208333, .0208333,
+                                .153334))
+        stats = edf_stats(data2)
+        assert allclose(stats, (.6, .1, .6, .7, .383333, .133333, 1.749722))
+        stats = edf_stats(data3)
+        assert allclose(stats, (.1, .6, .6, .7, .383333, .133333, 1.749722))
+        # Single statistics are given by function or by field name.
+        assert edf_stat(cvm_stat, data2) == cvm_stat(data2)
+        assert isclose(edf_stat('kuiper', data2), .7)
+
+    def test_rows(self):
+        # Samples in rows of a 2-D array give arrays of statistics.
+        rows = array((data1, data2, data3))
+        for stat in (ks_stat, cvm_stat, ad_stat):
+            assert allclose(stat(rows), [stat(row) for row in rows])
+        stats = edf_stats(rows)
+        for index, row in enumerate(rows):
+            assert allclose([s[index] for s in stats], edf_stats(row))
+
+    def test_accumulator(self):
+        data = sort(norm.cdf(norm.rvs(random_state=7, size=100)))
+        accumulator = EdfAccumulator(100)
+        accumulator.update(data[60:], 60)
+        other = EdfAccumulator(100)
+        other.update(data[:30], arange(30))
+        other.update(data[30:60], 30)
+        accumulator.merge(other)
+        assert allclose(accumulator.result(), edf_stats(data), rtol=.5e-12)
+
+    def test_grouped_stats(self):
+        stats = grouped_stats(data1, (1, 1, 1, 1))
+        assert allclose(stats, edf_stats(data1))
+        # Repeated values, grouped or given as separate entries.
+        data = sort(norm.cdf(norm.rvs(random_state=8, size=1000).round(1)))
+        stats = grouped_stats(*unique(data, return_counts=True))
+        assert allclose(stats, edf_stats(data), rtol=.5e-12)
+        assert allclose(grouped_stats(data, [1] * 1000), stats, rtol=.5e-12)
+
+    def test_weighted_stats(self):
+        # Equal weights give the usual statistics.
+        for weights in ((1, 1, 1, 1), (.5, .5, .5, .5)):
+            assert allclose(weighted_stats(data1, weights), edf_stats(data1))
+            assert allclose(ks_stat(data1, weights=weights), .125)
+            assert allclose(cvm_stat(data1, weights=weights), .0208333)
+            assert allclose(ad_stat(data1, weights=weights), .153334)
+        # Weights move the jumps of the empirical function.
+        stats = weighted_stats(data1, (3, 1, 1, 1))
+        assert allclose(stats[:4], (.375, .125, .375, .5))
+        assert isclose(effective_size((3, 1, 1, 1)), 3)
+        # Weights of 0 are as values left out.
+        assert allclose(weighted_stats(data2, (1, 0, 1, 1)),
+                        edf_stats(data2[[0, 2, 3]]))
+
+    def test_workspace(self):
+        # Results should not depend on the working array, which may be longer.
+        workspace = empty(10)
+        for stat in (ks_stat, cvm_stat, ad_stat):
+            for data in (data1, data2, data3):
+                assert stat(data, workspace=workspace) == stat(data)
+        assert edf_stats(data2, workspace) == edf_stats(data2)
+
+    def test_float32(self):
+        # Single precision data should not be upcast.
+        data = data1.astype(float32)
+        workspace = empty(4, float32)
+        assert ks_stat(data, workspace).dtype == float32
+        assert cvm_stat(data, workspace).dtype == float32
+        assert ad_stat(data, workspace).dtype == float32
+        assert isclose(ks_stat(data), .125, rtol=.5e-6)
+        assert isclose(cvm_stat(data), .0208333, rtol=.5e-4)
+        assert isclose(ad_stat(data), .153334, rtol=.5e-4)
+        # The AD sum cancels terms of the order of the sample count.
+        large = sort(uniform.rvs(size=10 ** 6, random_state=8)).astype(float32)
+        assert isclose(ad_stat(large), ad_stat(large.astype(float)))
+        assert isclose(edf_stats(large).ad, ad_stat(large.astype(float)))
+
+    def test_grid_cache(self):
+        ks_stat(data1)
+        grid = grid_cache['uniform', 4, dtype(float)]
+        assert_array_equal(grid, (0, .25, .5, .75, 1))
+        ks_stat(data2)
+        assert grid_cache['uniform', 4, dtype(float)] is grid
+        # A single grid should be created for the first AD test of a count.
+        grid_cache.clear()
+        ad_test(norm.rvs(random_state=3, size=1001), 'norm')
+        assert list(grid_cache) == [('factors', 1001, dtype(float))]
+        ad_stat(data1.astype(float32))
+        assert ('factors', 4, dtype(float)) in grid_cache
+        assert len(grid_cache) == 2
+
 
 class TestTests:
     def test_basic(self):
@@ -89,6 +197,271 @@ class TestTests:
         result = ad_test((1., .5), uniform(0, 1))
         assert allclose(result, (float('inf'), 0))
 
+    def test_overwrite_input(self):
+        # The array should be sorted in place and replaced with cdf values.
+        data = array((.7, .1, .4))
+        result = ks_test(data, uniform(0, 2), overwrite_input=True)
+        assert allclose(result, (.65, .0868333))
+        assert_array_equal(data, (.05, .2, .35))
+        # Not if it is not a float array.
+        data = array((3, 1, 2))
+        result = ks_test(data, uniform(0, 4), overwrite_input=True)
+        assert allclose(result, (.25, .972222))
+        assert_array_equal(data, (1, 2, 3))
+        # Nor if the values would be rounded.
+        data = norm.rvs(size=10 ** 4, random_state=9).astype(float32)
+        expected = ad_test(data, 'norm')
+        assert ad_test(data, 'norm', overwrite_input=True) == expected
+        assert_array_equal(data, sort(data))
+        # The data should be left alone otherwise.
+        data = array((.7, .1, .4))
+        ks_test(data, uniform(0, 2))
+        assert_array_equal(data, (.7, .1, .4))
+
+    def test_memmap(self, tmpdir):
+        data = memmap(str(tmpdir.join('data')), dtype=float, shape=(3,),
+                      mode='w+')
+        data[:] = (.7, .1, .4)
+        assert allclose(ks_test(data, uniform(0, 1)), (.3, .886222))
+        assert_array_equal(data, (.7, .1, .4))
+        ks_test(data, uniform(0, 1), overwrite_input=True)
+        assert_array_equal(data, (.1, .4, .7))
+
+    def test_check_sorted(self):
+        with raises(ValueError):
+            ks_test((.1, .7, .4), norm(0, 1), assume_sorted=True,
+                    check_sorted=True)
+        result = ks_test((.1, .4, .7), uniform(0, 1), assume_sorted=True,
+                         check_sorted=True)
+        assert allclose(result, (.3, .886222))
+        assert is_sorted(linspace(0, 1, 10 ** 5))
+        assert not is_sorted(linspace(1, 0, 10 ** 5))
+
+
+class GroupedTests:
+    def test_grouped_test(self):
+        values = norm.rvs(random_state=9, size=50).round(1)
+        counts = arange(1, 51)
+        for test, stat in ((ks_test, ks_stat), (cvm_test, cvm_stat),
+                           (ad_test, ad_stat)):
+            expected = test(repeat(values, counts), norm(0, 1))
+            result = grouped_test(values, counts, norm(0, 1), stat=stat,
+                                  pdist=test.keywords['pdist'])
+            assert isclose(result.statistic, expected.statistic, rtol=.5e-10)
+            assert isclose(result.pvalue, expected.pvalue)
+        result = grouped_test((.2, .6), (1, 3), 'uniform', stat='kuiper',
+                              pdist=ks_unif)
+        assert allclose(result.statistic, .75)
+        with raises(ValueError):
+            grouped_test((.1, .2), (1, 1), 'uniform', stat=len)
+
+    def test_compress(self):
+        # Repeated values should give the same results, compressed or not.
+        data = norm.rvs(random_state=10, size=1000).round(1)
+        for test in (ks_test, cvm_test, ad_test):
+            expected = test(data, norm(0, 1), compress=False)
+            result = test(data, norm(0, 1))
+            assert isclose(result.statistic, expected.statistic, rtol=.5e-10)
+            assert isclose(result.pvalue, expected.pvalue)
+        # Custom statistics get the repeated function values.
+        result = simple_test(data, norm(0, 1), stat=lambda u: u.mean(),
+                             pdist=lambda n: norm(.5, (12 * n) ** -.5))
+        assert isclose(result.statistic, norm.cdf(data).mean(), rtol=1e-12)
+        # Integers are counted.
+        data = (data * 10).astype(int)
+        expected = ks_test(data, norm(0, 10), compress=False)
+        assert ks_test(data, norm(0, 10)) == expected
+        assert ks_test(data[:5], norm(0, 10), compress=True) == \
+            ks_test(data[:5], norm(0, 10), compress=False)
+
+    def test_compress_memory(self):
+        # Deciding not to compress should not take full-size temporaries.
+        tracemalloc = importorskip('tracemalloc')
+        data = sort(norm.rvs(random_state=10, size=10 ** 6))
+        tracemalloc.start()
+        assert _runs(data, None) is None
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert peak < data.nbytes / 10
+
+
+class WeightedTests:
+    def test_weights(self):
+        data = norm.rvs(random_state=11, size=200)
+        weights = norm.rvs(random_state=12, size=200) ** 2
+        order = data.argsort()
+        for test, stat in ((ks_test, ks_stat), (cvm_test, cvm_stat),
+                           (ad_test, ad_stat)):
+            result = test(data, norm(0, 1), weights=weights)
+            statistic = stat(norm.cdf(data[order]), weights=weights[order])
+            assert isclose(result.statistic, statistic)
+            samples = int(round(effective_size(weights)))
+            pdist = test.keywords['pdist'](samples)
+            assert isclose(result.pvalue, pdist.sf(statistic))
+            assert test(data[order], norm(0, 1), assume_sorted=True,
+                        weights=weights[order]) == result
+        # Equal weights are as no weights.
+        assert allclose(ad_test(data, norm(0, 1), weights=[2] * 200),
+                        ad_test(data, norm(0, 1)))
+
+
+class DecisionTests:
+    def test_critical_value(self):
+        for pdist in (ks_unif, cvm_unif, ad_unif):
+            for samples in (10, 1000, 10000):
+                value = critical_value(pdist, samples, .01)
+                assert isclose(pdist(samples).sf(value), .01, rtol=1e-8)
+                assert critical_cache[(pdist, samples, .01)] == value
+        # Distributions are told apart even if they are not named.
+        first = spread_gen(a=0, b=1, shapes='samples')
+        second = spread_gen(a=0, b=2, shapes='samples')
+        assert first.name == second.name
+        assert isclose(critical_value(first, 10, .05), .95)
+        assert isclose(critical_value(second, 10, .05), 1.9)
+        # And may be plain callables.
+        pdist = lambda samples: uniform(0, samples)
+        assert isclose(critical_value(pdist, 10, .05), 9.5)
+        decision = simple_test((1, 2, 3), norm, stat=lambda data: 9.8,
+                               pdist=pdist, alpha=.05)
+        assert decision.reject
+
+    def test_critical_cache(self):
+        # Only the most recently used values should be kept.
+        pdist = lambda samples: uniform(0, samples)
+        critical_value(pdist, 1, .05)
+        for samples in range(2, critical_cache_size + 10):
+            critical_value(pdist, 1, .05)
+            assert isclose(critical_value(pdist, samples, .05),
+                           .95 * samples)
+        assert len(critical_cache) == critical_cache_size
+        assert (pdist, 1, .05) in critical_cache
+        assert (pdist, 2, .05) not in critical_cache
+        clear_caches()
+        assert not critical_cache and not grid_cache
+
+    def test_decision(self):
+        data = norm.rvs(random_state=13, size=500)
+        for test in (ks_test, cvm_test, ad_test):
+            for mean in (0, .2):
+                result = test(data, norm(mean, 1))
+                decision = test(data, norm(mean, 1), alpha=.01)
+                assert decision.statistic == result.statistic
+                assert decision.reject == (result.pvalue < .01)
+                assert decision.pvalue is None
+                decision = test(data, norm(mean, 1), alpha=.01,
+                                rejected_pvalue=True)
+                if decision.reject:
+                    assert decision.pvalue == result.pvalue
+                else:
+                    assert decision.pvalue is None
+        # Other paths of the tests decide too.
+        decision = ad_test(data.round(1), norm(.2, 1), alpha=.01)
+        assert decision.reject
+        decision = ad_test(data, norm(.2, 1), alpha=.01, weights=[2] * 500)
+        assert decision.reject
+
+
+class LazyTests:
+    def test_lazy(self):
+        calls = []
+
+        def sf(statistics):
+            calls.append(statistics)
+            return 1 - statistics
+
+        result = LazyResult(.25, sf)
+        assert result.statistic == .25 and result[0] == .25
+        assert calls == []
+        statistic, pvalue = result
+        assert (statistic, pvalue) == (.25, .75) == result
+        assert result.pvalue == .75 and result[1] == .75
+        assert len(calls) == 1
+        assert result._asdict() == {'statistic': .25, 'pvalue': .75}
+        # Results of simple tests are the same as eager ones.
+        data = norm.rvs(random_state=14, size=100)
+        for test in (ks_test, cvm_test, ad_test):
+            assert test(data, 'norm', lazy=True) == test(data, 'norm')
+        assert ad_test(data.round(1), 'norm', lazy=True) == \
+            ad_test(data.round(1), 'norm')
+
+    def test_select(self):
+        calls = []
+
+        def sf(statistics):
+            calls.append(len(statistics))
+            return 1 - statistics
+
+        result = LazyResult(array((.1, .5, .3, .9, .2)), sf)
+        top = result.largest(2)
+        assert_array_equal(top, (3, 1))
+        selected = result.select(top)
+        assert isinstance(selected, GofResult)
+        assert allclose(selected.pvalue, (.1, .5))
+        # Only missing p-values are computed, in one call each time.
+        assert allclose(result.select([1, 2]).pvalue, (.5, .7))
+        assert allclose(result.pvalue, (.9, .5, .7, .1, .8))
+        assert calls == [2, 1, 2]
+        assert len(result.largest(10)) == 5
+
+    def test_batch(self):
+        # Rows of a batch should be tested as separate samples.
+        batch = norm(.1, 1).rvs(random_state=15, size=(5, 200))
+        for test in (ks_test, cvm_test, ad_test):
+            expected = array([test(row, 'norm') for row in batch])
+            for lazy in (False, True):
+                result = test(batch, 'norm', lazy=lazy)
+                assert allclose(result.statistic, expected[:, 0])
+                assert allclose(result.pvalue, expected[:, 1])
+            ordered = sort(batch, axis=-1)
+            result = test(ordered, 'norm', assume_sorted=True,
+                          check_sorted=True)
+            assert allclose(result.pvalue, expected[:, 1])
+            decision = test(batch, 'norm', alpha=.3, rejected_pvalue=True)
+            assert_array_equal(decision.reject, expected[:, 1] < .3)
+            assert allclose(decision.pvalue[decision.reject],
+                            expected[decision.reject, 1])
+        assert not is_sorted(batch)
+        with raises(ValueError):
+            ks_test(batch, 'norm', weights=batch)
+
+
+class PreparedSampleTests:
+    def test_tests(self):
+        # Should give the same results as the simple tests.
+        data = norm.rvs(random_state=2, size=50)
+        sample = PreparedSample(data, norm(.1, 1))
+        assert allclose(sample.ks(), ks_test(data, norm(.1, 1)))
+        assert allclose(sample.cvm(), cvm_test(data, norm(.1, 1)))
+        assert allclose(sample.ad(), ad_test(data, norm(.1, 1)))
+        stats = sample.stats()
+        assert allclose((stats.ks, stats.cvm, stats.ad),
+                        (sample.ks()[0], sample.cvm()[0], sample.ad()[0]))
+        sample = PreparedSample((.4, .1, .7), 'uniform', args=(0, 1))
+        assert allclose(sample.test(ks_stat, ks_unif), (.3, .886222))
+
+    def test_caching(self):
+        # The distribution function should only be evaluated once.
+        calls = []
+
+        class Dist:
+            def cdf(self, data):
+                calls.append(data)
+                return data
+
+        sample = PreparedSample((.7, .1, .4), Dist())
+        sample.ks()
+        sample.cvm()
+        sample.ad()
+        assert len(calls) == 1
+        assert_array_equal(sample.data, (.1, .4, .7))
+
+    def test_from_uniform(self):
+        sample = PreparedSample.from_uniform((.7, .1, .4))
+        assert len(sample) == 3
+        assert allclose(sample.ks(), (.3, .886222))
+        assert allclose(sample.cvm(), (.06, .851737))
+        assert allclose(sample.ad(), (.366028, .875957))
+
 
 class TestBenchmarks:
     @mark.benchmark(group='ks-test-small')
@@ -156,3 +529,8 @@ class TestBenchmarks:
         result = benchmark(ad_test, linspace(0, 1, 1e6)[1:-1], uniform(0, 1),
                            assume_sorted=True)
         assert allclose(result, (0., 1.), atol=.5e-4)
+
+    @mark.benchmark(group='edf-stats-large')
+    def benchmark_edf_stats_large(self, benchmark):
+        result = benchmark(edf_stats, linspace(0, 1, 10 ** 6)[1:-1])
+        assert allclose(result, 0, atol=.5e-4)
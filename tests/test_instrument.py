@@ -0,0 +1,57 @@
+from __future__ import division
+
+import json
+
+from numpy import arange
+from scipy.stats import norm
+
+from skgof.ecdfgof import critical_cache, critical_value, ks_test
+from skgof import instrument
+from skgof.instrument import Recorder, instrumented, phases
+from skgof.ksdist import ks_unif
+
+
+class InstrumentTests:
+    def test_phases(self):
+        data = norm.rvs(size=500, random_state=1)
+        with instrumented() as active:
+            ks_test(data, norm)
+            ks_test(data, norm)
+            ks_test(arange(100) % 7, norm)
+        timings = active.as_dict()['timings']
+        assert timings['sort']['count'] == 2
+        assert timings['pvalue']['count'] == 2
+        assert timings['count']['count'] == 1
+        assert timings['grouped']['count'] == 1
+        assert timings['cdf']['total'] >= timings['cdf']['longest'] >= 0
+
+    def test_counters(self):
+        with instrumented() as active:
+            ks_unif(1000).cdf((.01, .03, .05, .5))
+            ks_unif(100).cdf(.3)
+        report = active.as_dict()
+        assert report['counters']['ks_unif.method'] == \
+            {'durbin': 3, 'limit': 1, 'doubled': 1}
+        # Orders 21, 61 and 101.
+        assert report['histograms']['ks_unif.order'] == {32: 1, 64: 1, 128: 1}
+
+    def test_caches(self):
+        critical_cache.clear()
+        with instrumented() as active:
+            for _ in range(3):
+                critical_value(ks_unif, 40, .05)
+        assert active.as_dict()['caches']['critical'] == \
+            {'hits': 2, 'misses': 1, 'rate': 2 / 3}
+        assert json.loads(active.to_json())['caches']['critical']['hits'] == 2
+
+    def test_disabled(self):
+        # Nothing is recorded outside of blocks; recorders may be reused.
+        assert instrument.recorder is None
+        assert phases().mark('sort', 3) == 3
+        active = Recorder()
+        with instrumented(active):
+            with instrumented():
+                ks_test((.1, .5, .7), 'uniform')
+            ks_test((.1, .5, .7), 'uniform')
+        ks_test((.1, .5, .7), 'uniform')
+        assert active.as_dict()['timings']['statistic']['count'] == 1
@@ -0,0 +1,66 @@
+from __future__ import division
+
+from numpy import allclose, array, isclose
+from numpy.random import RandomState
+from scipy.stats import multivariate_normal
+
+from skgof.ks2d import (ks2d_2samp_stat, ks2d_2samp_test, ks2d_null, ks2d_stat,
+                        ks2d_test, quadrant_counts)
+
+reference = multivariate_normal((0, 0), ((1, .3), (.3, 1)))
+shifted = multivariate_normal((0, .4), ((1, .3), (.3, 1)))
+
+
+def counted_quadrants(x, y, counted):
+    # Direct O(n^2) counts.
+    xs, ys = x[counted], y[counted]
+    return array([[((xs <= a) & (ys <= b)).sum(), ((xs <= a) & (ys > b)).sum(),
+                   ((xs > a) & (ys <= b)).sum(), ((xs > a) & (ys > b)).sum()]
+                  for a, b in zip(x, y)]).T
+
+
+class Ks2dTests:
+    def test_quadrants(self):
+        state = RandomState(1)
+        for samples in (1, 2, 7, 33, 100):
+            x, y = state.uniform(size=(2, samples))
+            counted = state.uniform(size=samples) < .5
+            assert (array(quadrant_counts(x, y)) ==
+                    counted_quadrants(x, y, counted | True)).all()
+            assert (array(quadrant_counts(x, y, counted)) ==
+                    counted_quadrants(x, y, counted)).all()
+            # Rows are separate samples.
+            xs, ys = state.uniform(size=(2, 3, samples))
+            counts = array(quadrant_counts(xs, ys, counted))
+            for row in range(3):
+                assert (counts[:, row] ==
+                        counted_quadrants(xs[row], ys[row], counted)).all()
+
+    def test_stat(self):
+        points = ((.2, .6), (.7, .3))
+
+        class uniform:
+            @staticmethod
+            def cdf(points):
+                return points.clip(max=1).prod(axis=-1)
+
+        # Around (.2, .6) the first quadrant has 1/2 of the points and a
+        # probability of .12; around (.7, .3) 1/2 and .21.
+        assert isclose(ks2d_stat(points, uniform), .38)
+        assert isclose(ks2d_2samp_stat(points, ((.5, .5),)), .75)
+        data = reference.rvs(size=(3, 50), random_state=2)
+        assert allclose(ks2d_stat(data, reference),
+                        [ks2d_stat(d, reference) for d in data])
+
+    def test_test(self):
+        data = reference.rvs(size=300, random_state=3)
+        assert ks2d_test(data, reference, random_state=4).pvalue > .05
+        data = shifted.rvs(size=300, random_state=5)
+        assert ks2d_test(data, reference, random_state=4).pvalue < .05
+        # Null statistics are simulated once per sample count.
+        assert ks2d_null(300) is ks2d_null(300)
+        first = reference.rvs(size=100, random_state=6)
+        second = reference.rvs(size=150, random_state=7)
+        assert ks2d_2samp_test(first, second, random_state=8).pvalue > .05
+        second = shifted.rvs(size=150, random_state=7)
+        assert ks2d_2samp_test(first, second, random_state=8).pvalue < .05
@@ -0,0 +1,129 @@
+from __future__ import division
+
+from functools import partial
+from itertools import combinations
+
+from numpy import allclose, arange, array, diff, isclose, linspace, setdiff1d
+from scipy.stats import norm
+
+from skgof.ksample import (PooledSamples, ad_ksamp_sf, ad_ksamp_test,
+                           cvm_2samp_test, ks_2samp_sf, ks_2samp_stat,
+                           ks_2samp_test, permutation_test)
+from skgof.ksdist import ks_2samp_lattice
+
+isclose = partial(isclose, atol=0, rtol=1e-10)
+
+
+def enumerated_sf(n, m, statistic):
+    # Probability over all placements of the first sample among pooled ranks.
+    pooled = arange(n + m)
+    count = total = 0
+    for first in combinations(pooled, n):
+        second = setdiff1d(pooled, first)
+        total += 1
+        count += ks_2samp_stat(array(first), second) >= statistic - 1e-12
+    return count / total
+
+
+class KsTwoSampleTests:
+    def test_stat(self):
+        assert isclose(ks_2samp_stat((1, 2, 3), (2.5, 3.5, 4.5, 5.5)), .75)
+        assert isclose(ks_2samp_stat((1, 2, 3), (1, 2, 3)), 0)
+        # Ties count after all equal values.
+        assert isclose(ks_2samp_stat((1, 2, 2, 3), (2, 3)), .25)
+        rows = ks_2samp_stat(((1, 2, 3), (1, 2, 3)),
+                             ((2.5, 3.5, 4.5, 5.5), (0, 1, 2, 3)))
+        assert allclose(rows, (.75, .25))
+
+    def test_lattice(self):
+        for n, m in ((3, 3), (4, 5), (6, 3)):
+            for statistic in (1 / 6, .25, .4, .5, 2 / 3, 1):
+                assert isclose(ks_2samp_lattice(n, m, statistic),
+                               enumerated_sf(n, m, statistic))
+        assert ks_2samp_lattice(10, 20, 0) == 1
+        # Values checked against scipy.stats.ks_2samp(method='exact').
+        assert isclose(ks_2samp_lattice(100, 150, .4), 4.721655897148735e-09,
+                       rtol=1e-9)
+        assert isclose(ks_2samp_lattice(1000, 700, .05), .24552136352669604,
+                       rtol=1e-9)
+
+    def test_test(self):
+        first = norm.rvs(random_state=20, size=300)
+        second = norm(.3, 1).rvs(random_state=21, size=200)
+        result = ks_2samp_test(first, second)
+        assert isclose(result.pvalue, ks_2samp_sf(result.statistic, 300, 200))
+        assert result.pvalue < .05
+        # The asymptotic approximation should be fair.
+        approximate = ks_2samp_sf(result.statistic, 300, 200, exact=False)
+        assert isclose(approximate, result.pvalue, rtol=.1)
+        # Batches of pairs.
+        firsts, seconds = first.reshape(3, 100), second.reshape(2, 100)
+        results = ks_2samp_test(firsts[:2], seconds)
+        for index in range(2):
+            assert results[0][index] == \
+                ks_2samp_test(firsts[index], seconds[index]).statistic
+            assert isclose(results[1][index],
+                           ks_2samp_test(firsts[index], seconds[index]).pvalue)
+        lazy = ks_2samp_test(firsts[:2], seconds, lazy=True)
+        assert (lazy.statistic == results.statistic).all()
+        assert allclose(lazy.select([1]).pvalue, results.pvalue[1:])
+
+
+class KSampleTests:
+    # Values checked against scipy.stats.anderson_ksamp() (midrank) and
+    # scipy.stats.cramervonmises_2samp(method='asymptotic').
+    def samples(self, ties=False):
+        samples = [norm(0, 1).rvs(random_state=40 + index, size=size)
+                   for index, size in enumerate((30, 50, 20))]
+        samples[2] += .2
+        return [sample.round(1) for sample in samples] if ties else samples
+
+    def test_ad(self):
+        result = ad_ksamp_test(self.samples())
+        assert isclose(result.statistic, .2411823558361989, rtol=1e-9)
+        # SciPy caps p-values at .25, the fit is extrapolated here.
+        assert isclose(result.pvalue, .3152232958394165, rtol=1e-9)
+        result = ad_ksamp_test(self.samples(ties=True))
+        assert isclose(result.statistic, .2309351810825499, rtol=1e-9)
+
+    def test_ad_separated(self):
+        # Beyond the table p-values should keep decreasing (SciPy gives its
+        # floor of .001 for these).
+        for size in (100, 300, 1000):
+            samples = (norm(0, 1).rvs(random_state=1, size=size),
+                       norm(3, 1).rvs(random_state=2, size=size))
+            assert ad_ksamp_test(samples).pvalue < .001
+        statistics = linspace(-3, 60, 200)
+        for count in (2, 3, 10):
+            pvalues = ad_ksamp_sf(statistics, (1,) * count)
+            assert (diff(pvalues) <= 0).all() and pvalues[-1] < 1e-20
+
+    def test_cvm(self):
+        first, second = self.samples()[:2]
+        result = cvm_2samp_test(first, second)
+        assert isclose(result.statistic, .3810833333333328, rtol=1e-9)
+        assert isclose(result.pvalue, .0813181091720937, rtol=1e-9)
+        first, second = self.samples(ties=True)[:2]
+        result = cvm_2samp_test(first, second)
+        assert isclose(result.statistic, .38412499999999916, rtol=1e-9)
+
+    def test_pooled(self):
+        first, second = self.samples(ties=True)[:2]
+        pooled = PooledSamples((first, second))
+        assert isclose(pooled.ks(), ks_2samp_stat(first, second))
+        # Statistics only depend on the labels of the pooled values.
+        labels = pooled.labels[::-1]
+        swapped = PooledSamples((pooled.values[labels == 0],
+                                 pooled.values[labels == 1]))
+        assert isclose(pooled.ad(labels), swapped.ad())
+        assert isclose(pooled.cvm(labels), swapped.cvm())
+
+    def test_permutations(self):
+        samples = self.samples()
+        pvalue = permutation_test(samples, 'ad', 999, random_state=1)
+        assert isclose(pvalue, ad_ksamp_test(samples).pvalue, rtol=.1)
+        # Results do not depend on the number of workers.
+        assert pvalue == permutation_test(samples, 'ad', 999, workers=1,
+                                          random_state=1)
+        pvalue = permutation_test(samples[:2], 'ks', 999, random_state=1)
+        assert isclose(pvalue, ks_2samp_test(*samples[:2]).pvalue, rtol=.2)
@@ -10,8 +10,10 @@ import pytest
 from ksref import (exact_values, almost_exact_values, marsaglia_values,
                    simard_values, simard_pelz_values, brown_values,
                    oconnor_values, oconnor_asymptotic_values)
-from skgof.ksdist import (ks_unif, ks_unif_durbin_matrix, ks_unif_pelz_good,
-                          ks_unif_durbin_recurrence_rational)
+from skgof.ksdist import (calibrate, default_costs, ks_unif,
+                          ks_unif_durbin_matrix, ks_unif_pelz_good,
+                          ks_unif_durbin_recurrence_rational, ks_unif_gen,
+                          ks_unif_method, ks_discrete_sf)
 
 # Should we execute bigger cases (about 10 times slower than the "small" ones).
 slow = pytest.config.getoption('--slow')
@@ -125,3 +127,31 @@ class UnifTests:
         assert isclose(cdf(100000, .2 / sqrt(100000)), .59181e-12, rtol=.5e-3)
         assert isclose(cdf(100000, 1 / sqrt(100000)), .73056, rtol=.5e-3)
         assert isclose(cdf(100000, 2.2 / sqrt(100000)), .99988, rtol=.5e-3)
+
+    def test_method(self):
+        # Accurate methods when affordable, quicker ones under a budget.
+        assert ks_unif_method(1000, .03) == 'durbin'
+        assert ks_unif_method(1000, .03, rtol=1e-6) == 'pelz-good'
+        assert ks_unif_method(1000, .03, budget=1e-4) == 'pelz-good'
+        assert ks_unif_method(100, .3) == 'doubled'
+        quick = ks_unif_gen(budget=1e-4)
+        assert quick(1000).dist.budget == 1e-4
+        assert isclose(quick(1000).cdf(.03), ks_unif(1000).cdf(.03),
+                       rtol=1e-6)
+
+    def test_costs(self):
+        # Calibration should only affect distributions given the costs.
+        before = dict(default_costs)
+        costs = calibrate(repeat=1)
+        assert sorted(costs) == sorted(before) and default_costs == before
+        slow_matrix = dict(costs, matmul=1.)
+        assert ks_unif_method(1000, .03, costs=slow_matrix) != 'durbin'
+        assert ks_unif_gen(costs=slow_matrix)(1000).dist.costs is slow_matrix
+        assert isclose(ks_unif_gen(costs=slow_matrix).cdf(.03, 1000),
+                       ks_unif.cdf(.03, 1000), rtol=1e-6)
+
+    def test_large_statistics(self):
+        # The Pelz-Good series fails for large samples * statistic ** 2.
+        for sp, st in ((1000, .1), (1000, .5), (20000, .03)):
+            assert isclose(ks_unif(sp).sf(st), ks_discrete_sf(st, sp, (), ()),
+                           rtol=1e-8)
@@ -0,0 +1,60 @@
+from __future__ import division
+
+from numpy import allclose, array, isclose, linspace, log, sort
+from scipy.optimize import check_grad
+from scipy.stats import gamma, norm
+from pytest import raises
+
+from skgof.ecdfgof import ad_stat, cvm_stat, ks_stat
+from skgof.mindist import MinDistance, min_distance_fit
+
+data = gamma(2, 1, 3).rvs(random_state=15, size=2000)
+
+
+class MinDistanceTests:
+    def test_gradient(self):
+        for stat in ('cvm', 'ad'):
+            distance = MinDistance(data, gamma, stat)
+            point = array((1.8, .8, log(2.7)))
+
+            def value(point):
+                return distance.objective(point)[0]
+
+            def gradient(point):
+                return distance.objective(point)[1]
+
+            error = check_grad(value, gradient, point)
+            assert error < 1e-5 * abs(gradient(point)).max()
+
+    def test_statistic(self):
+        distance = MinDistance(data, gamma, 'ad')
+        expected = ad_stat(gamma(1.8, .8, 2.7).cdf(sort(data)))
+        assert isclose(distance.statistic((1.8, .8, log(2.7))), expected)
+        assert isclose(distance.objective((1.8, .8, log(2.7)))[0], expected)
+
+    def test_fit(self):
+        for stat in (ks_stat, cvm_stat, ad_stat):
+            fit = min_distance_fit(data, gamma, stat)
+            assert allclose(fit.params, (2, 1, 3), rtol=.1)
+            assert isclose(stat(fit.dist.cdf(sort(data))), fit.statistic)
+            # Parameters nearby should give larger statistics.
+            for shift in (-.01, .01):
+                params = fit.params[:1] + (fit.params[1] + shift,
+                                           fit.params[2])
+                assert stat(gamma(*params).cdf(sort(data))) > fit.statistic
+        normal = norm(2, 3).rvs(random_state=16, size=2000)
+        fit = min_distance_fit(normal, 'norm', 'cvm')
+        assert allclose(fit.params, norm.fit(normal), rtol=.05)
+
+    def test_grid(self):
+        distance = MinDistance(data, gamma, 'cvm')
+        best = distance.search((linspace(1, 4, 7)[:, None], 1,
+                                linspace(1, 5, 9)))
+        assert best == (2, 1, 3)
+        fit = min_distance_fit(data, gamma, grid=(linspace(1, 4, 7)[:, None],
+                                                  1, linspace(1, 5, 9)))
+        assert allclose(fit.params, (2, 1, 3), rtol=.1)
+
+    def test_unsupported(self):
+        with raises(ValueError):
+            MinDistance(data, gamma, 'watson')
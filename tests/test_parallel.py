@@ -0,0 +1,59 @@
+from __future__ import division
+
+from numpy import array, sort
+from numpy.random import RandomState
+from numpy.testing import assert_array_equal
+from scipy.stats import norm
+from pytest import mark
+
+from skgof.ecdfgof import cvm_test
+from skgof.parallel import parallel_cdf, parallel_sort
+
+random = RandomState(10)
+floats = random.normal(size=10 ** 5)
+ints = random.randint(0, 100, size=10 ** 5)
+
+
+class SortTests:
+    def test_sort(self):
+        for data in (floats, ints, floats[:100]):
+            for workers in (1, 2, 3, 8):
+                assert_array_equal(parallel_sort(data, workers), sort(data))
+
+    def test_overwrite_input(self):
+        data = array(floats)
+        result = parallel_sort(data, 4, overwrite_input=True)
+        assert_array_equal(result, sort(floats))
+        data = array(floats[:10])
+        result = parallel_sort(data, 4, overwrite_input=True)
+        assert result is data
+        assert_array_equal(data, sort(floats[:10]))
+
+
+class CdfTests:
+    def test_cdf(self):
+        dist = norm(0, 2)
+        for workers in (1, 3):
+            assert_array_equal(parallel_cdf(dist, floats, workers),
+                               dist.cdf(floats))
+        data = array(floats)
+        parallel_cdf(dist, data, 3, out=data)
+        assert_array_equal(data, dist.cdf(floats))
+
+    def test_simple_test(self):
+        # Results should not depend on the number of threads.
+        result = cvm_test(floats, norm(0, 1))
+        assert cvm_test(floats, norm(0, 1), workers=4) == result
+        assert cvm_test(floats, norm(0, 1), workers=None) == result
+
+
+class ParallelBenchmarks:
+    @mark.benchmark(group='sort-large')
+    def benchmark_sort_large(self, benchmark):
+        data = RandomState(11).random_sample(10 ** 6)
+        benchmark(sort, data)
+
+    @mark.benchmark(group='sort-large')
+    def benchmark_parallel_sort_large(self, benchmark):
+        data = RandomState(11).random_sample(10 ** 6)
+        benchmark(parallel_sort, data)
@@ -0,0 +1,27 @@
+from __future__ import division
+
+from scipy.stats import norm
+
+from skgof.ecdfgof import ad_stat, ks_stat
+from skgof.power import power_curves
+
+
+class PowerTests:
+    def test_curves(self):
+        alternatives = norm(0, 1), norm(.3, 1)
+        curves = power_curves('norm', alternatives, (20, 100), (0, 1),
+                              tests=(ks_stat, 'cvm', ad_stat), rounds=2000,
+                              random_state=1)
+        assert list(curves) == ['ks', 'cvm', 'ad']
+        for power, low, high in curves.values():
+            assert power.shape == (2, 2)
+            assert (low <= power).all() and (power <= high).all()
+            # Under the hypothesis tests reject at about the alpha rate.
+            assert (low[0] < .05).all() and (.05 < high[0]).all()
+            # Power grows with the sample count.
+            assert power[1, 0] < power[1, 1]
+        # Results do not depend on the number of threads.
+        single = power_curves(norm(0, 1), alternatives, (20, 100),
+                              rounds=2000, workers=1, random_state=1)
+        for field in curves:
+            assert (single[field].power == curves[field].power).all()
@@ -0,0 +1,55 @@
+from __future__ import division
+
+from numpy import allclose, arange, isclose
+from scipy.stats import expon, gamma, norm
+
+from skgof.ecdfgof import ad_test, cvm_stat, cvm_test, ks_test
+from skgof.ksdist import ks_unif
+from skgof.screen import screen
+
+data = gamma(2).rvs(random_state=14, size=500)
+
+
+class ScreenTests:
+    def test_screen(self):
+        candidates = ([gamma(a) for a in (1, 1.5, 2, 3)] +
+                      [norm(2, s) for s in (1, 1.5)] + [expon(0, 2)])
+        for stat, test in (('ks', ks_test), (cvm_stat, cvm_test),
+                           ('ad', ad_test)):
+            results = screen(data, candidates, stat=stat,
+                             pdist=test.keywords['pdist'])
+            assert len(results) == len(candidates)
+            assert results[0].dist.args == (2,)
+            for result in results:
+                expected = test(data, result.dist)
+                assert isclose(result.statistic, expected.statistic)
+                assert isclose(result.pvalue, expected.pvalue)
+            statistics = [result.statistic for result in results]
+            assert statistics == sorted(statistics)
+
+    def test_broadcast(self):
+        shapes = arange(1, 4)
+        results = screen(data, gamma(shapes[:, None], scale=(1, 2)),
+                         stat='kuiper', pdist=ks_unif)
+        assert len(results) == 6
+        assert results[0].dist.args == (2,)
+        assert results[0].dist.kwds == {'scale': 1}
+
+    def test_other(self):
+        # Objects other than SciPy distributions are evaluated separately.
+        class Uniform(object):
+            def cdf(self, data):
+                return data.clip(0, 10) / 10
+
+        candidate = Uniform()
+        results = screen(data, [candidate, gamma(2)], stat='ks', pdist=ks_unif)
+        assert results[1].dist is candidate
+        assert allclose(results[1][:2], ks_test(data, candidate))
+
+    def test_pvalues(self):
+        candidates = gamma(arange(1, 4), scale=2 / arange(1, 4))
+        full = screen(data, candidates)
+        partial = screen(data, candidates, pvalues=1)
+        assert [r.statistic for r in full] == [r.statistic for r in partial]
+        assert partial[0].pvalue == full[0].pvalue
+        assert partial[1].pvalue is None and partial[2].pvalue is None
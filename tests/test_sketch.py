@@ -0,0 +1,85 @@
+from __future__ import division
+
+from numpy import allclose, histogram, inf, isclose, linspace
+from numpy.testing import assert_array_equal
+from scipy.stats import norm
+from pytest import raises
+
+from skgof.cvmdist import cvm_unif
+from skgof.ecdfgof import ad_test, cvm_stat, cvm_test, ks_stat, ks_test
+from skgof.ksdist import ks_unif
+from skgof.sketch import EdfSketch, binned_stats, histogram_test
+
+data = norm(0, 1).rvs(random_state=12, size=20000)
+
+
+class SketchTests:
+    def test_bounds(self):
+        # Bounds should hold and estimates should be close for any data.
+        for loc, size, bins in ((0, 20000, 1024), (.02, 20000, 1024),
+                                (0, 200, 1024), (.1, 200, 16)):
+            sketch = EdfSketch(norm(loc, 1), bins=bins)
+            sketch.update(data[:size])
+            for result, test, rtol in ((sketch.ks(), ks_test, .05),
+                                       (sketch.cvm(), cvm_test, .05),
+                                       (sketch.ad(), ad_test, .05)):
+                expected = test(data[:size], norm(loc, 1))
+                low, high = result.bounds
+                assert low <= expected.statistic <= high
+                plow, phigh = result.pvalue_bounds
+                assert plow <= expected.pvalue <= phigh
+                if bins >= 1024:
+                    assert isclose(result.statistic, expected.statistic,
+                                   rtol=rtol)
+        # KS bounds should be within two bin widths.
+        low, high = sketch.ks().bounds
+        assert high - low <= 2 / 16
+
+    def test_merge(self):
+        sketch = EdfSketch('norm', bins=64)
+        sketch.update(data)
+        parts = EdfSketch(norm(0, 1), bins=64), EdfSketch(norm(0, 1), bins=64)
+        parts[0].update(data[:5000])
+        parts[1].update(data[5000:])
+        parts[0].merge(parts[1])
+        assert_array_equal(parts[0].counts, sketch.counts)
+        assert parts[0].samples == 20000
+        assert allclose(parts[0].ad()[:2], sketch.ad()[:2])
+        with raises(ValueError):
+            parts[0].merge(EdfSketch(norm(0, 1), bins=32))
+
+
+class BinnedTests:
+    def test_exact(self):
+        # With all values at bin edges the bounds meet at the statistics.
+        stats = binned_stats((.1, .1, .4, .4, .7, .7), (1, 0, 1, 0, 1),
+                             .1, .7)
+        assert isclose(stats.ks.low, .3) and isclose(stats.ks.high, .3)
+        assert isclose(stats.cvm.estimate, .06)
+        assert isclose(stats.ad.estimate, .366028, rtol=.5e-5)
+        for stat in stats[1:]:
+            assert stat.low <= stat.estimate <= stat.high
+
+    def test_unbounded(self):
+        # Values arbitrarily close to 0 or 1 make AD arbitrarily large.
+        stats = binned_stats((0, .5, 1), (1, 1))
+        assert stats.ks.low == 0 and stats.ks.high == .5
+        assert stats.ad.high == float('inf')
+
+    def test_histogram(self):
+        # A histogram gives the same results as a sketch with equal bins.
+        sketch = EdfSketch(norm(0, 1), bins=64)
+        sketch.update(data)
+        edges = norm.ppf(linspace(0, 1, 65))
+        counts = histogram(data, edges)[0]
+        result = histogram_test(edges, counts, norm(0, 1), stat=cvm_stat,
+                                pdist=cvm_unif, first=data.min(),
+                                last=data.max())
+        assert allclose(result[:2], sketch.cvm()[:2])
+        # Bounds hold for uneven bins.
+        edges = (-inf, -1, -.1, 0, .2, 2, inf)
+        counts = histogram(data, edges)[0]
+        expected = ks_test(data, norm(0, 1))
+        result = histogram_test(edges, counts, 'norm', stat=ks_stat,
+                                pdist=ks_unif)
+        assert result.bounds[0] <= expected.statistic <= result.bounds[1]
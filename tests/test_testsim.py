@@ -1,5 +1,6 @@
 from __future__ import division
 
+from numpy import array, ones
 from numpy.testing import assert_array_equal
 
 from skgof.testsim import simulator
@@ -23,3 +24,30 @@ class SimulatorTests:
             return i[0]
 
         assert_array_equal(simulator(stat, 3, 10, 10), range(9))
+
+    def test_weights(self):
+        # Weights should follow their values through sorting.
+
+        def stat(data, weights):
+            assert (data[1:] >= data[:-1]).all()
+            return weights[0]
+
+        weights = array((1., 2., 3.))
+        result = simulator(stat, 3, 10, 1000, weights)
+        assert set(result) == set(weights)
+        assert_array_equal(simulator(lambda d, weights: weights.sum(), 3, 10,
+                                     10, ones(3)), [3] * 9)
+
+    def test_vectorized(self):
+        # Batches of points are passed at once, unsorted.
+
+        def stat(data):
+            assert data.shape[1:] == (5, 2)
+            return data[:, :, 0].max(axis=1)
+
+        result = simulator(stat, 5, 10, 1000, dimensions=2, vectorized=True,
+                           random_state=1)
+        assert len(result) == 9
+        assert (result[1:] >= result[:-1]).all()
+        assert_array_equal(result, simulator(stat, 5, 10, 1000, dimensions=2,
+                                             vectorized=True, random_state=1))
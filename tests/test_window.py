@@ -0,0 +1,75 @@
+from __future__ import division
+
+from numpy import allclose, around, concatenate, sort
+from pytest import raises
+from scipy.stats import norm
+
+from skgof.ecdfgof import critical_cache, edf_stats, ks_test
+from skgof.ksdist import ks_unif
+from skgof.window import WindowMonitor
+
+data = norm(0, 1).rvs(random_state=13, size=3000)
+
+
+class WindowTests:
+    def test_stats(self):
+        # Statistics should match the ones of the sorted window contents,
+        # both while the window fills up and after evictions start.
+        for values, window, block_size in ((data, 300, 4),
+                                           (around(data, 1), 100, 4),
+                                           (data, 1000, None)):
+            monitor = WindowMonitor(norm(0, 1), window, block_size=block_size)
+            for index, value in enumerate(values[:2000]):
+                monitor.update(value)
+                if index % 83 == 0:
+                    start = max(0, index + 1 - window)
+                    uniform = sort(norm.cdf(values[start:index + 1]))
+                    assert len(monitor) == len(uniform)
+                    assert allclose(monitor.stats(), edf_stats(uniform),
+                                    rtol=1e-9, atol=0)
+
+    def test_batches(self):
+        monitor = WindowMonitor('norm', 500)
+        monitor.update(data[:700])
+        monitor.update(data[700:1200])
+        assert allclose(monitor.test(), ks_test(data[700:1200], norm(0, 1)))
+        monitor.update(data[:10])
+        expected = edf_stats(sort(norm.cdf(data[710:1200].tolist() +
+                                           data[:10].tolist())))
+        assert allclose(monitor.stats(), expected)
+
+    def test_buffer(self):
+        # Buffered values should be added in order, before any query.
+        monitor = WindowMonitor(norm(0, 1), 20, batch=8)
+        for value in data[:13]:
+            monitor.update(value)
+        assert len(monitor) == 13 and len(monitor.pending) == 5
+        monitor.update(data[13:30])
+        assert not monitor.pending
+        for value in data[30:33]:
+            monitor.update(value)
+        assert len(monitor) == 20
+        expected = edf_stats(sort(norm.cdf(data[13:33])))
+        assert allclose(monitor.stats(), expected)
+        assert not monitor.pending
+
+    def test_drift(self):
+        monitor = WindowMonitor(norm(0, 1), 1000, alpha=.01)
+        monitor.update(data[:999] + 1)
+        assert not monitor.drift()
+        monitor.update(data[999:2000])
+        assert not monitor.drift()
+        monitor.update(data[:500] + .5)
+        assert monitor.drift()
+        assert monitor.test().pvalue < .01
+        # Checks after each value should flag the same one as a full test.
+        monitor = WindowMonitor(norm(0, 1), 200, alpha=.01)
+        assert monitor.critical == critical_cache[ks_unif, 200, .01]
+        monitor.update(data[:200])
+        shifted = data[200:400] + .5
+        for index, value in enumerate(shifted):
+            monitor.update(value)
+            window = concatenate((data[index + 1:200], shifted[:index + 1]))
+            assert monitor.drift() == (ks_test(window, 'norm').pvalue < .01)
+        with raises(ValueError):
+            WindowMonitor(norm(0, 1), 200).drift()